@@ -79,9 +79,16 @@ def _configure_app(app):
     # Store application start time for metrics
     app.start_time = time.time()
 
+    # Serialize JSON responses with orjson when it is installed
+    from .utils.json_provider import configure_json_provider
+    configure_json_provider(app)
+
     # Ensure upload directory exists
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
+    # Resolve the upload root once so file requests only resolve the file path
+    app.config["REAL_UPLOAD_FOLDER"] = os.path.realpath(app.config["UPLOAD_FOLDER"])
+
 
 def _initialize_extensions(app):
     """Initialize Flask extensions"""
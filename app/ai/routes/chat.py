@@ -6,6 +6,7 @@ from flask_login import current_user, login_required
 
 from ...models import HealthRecord
 from ...utils.ai_helpers import (
+    DEMO_MODEL_NAME,
     call_deepseek_api,
     call_groq_api,
     call_huggingface_api,
@@ -359,7 +360,7 @@ def call_ai_with_fallback(
     # If all AI providers fail, generate a demo response
     logger.warning("All AI providers failed or returned None, using demo response")
     demo_response = generate_demo_medical_response(user_message)
-    return demo_response, "Demo Mode"
+    return demo_response, DEMO_MODEL_NAME
 
 
 def generate_demo_medical_response(user_message):
@@ -612,7 +613,7 @@ def _handle_chat_json_request():
             "response": processed_response,
             "mode": mode,
             "patient": patient_id,
-            "model": model_used or "Demo Mode",
+            "model": model_used or DEMO_MODEL_NAME,
             "search_info": {
                 "local_results": len(
                     [
@@ -73,7 +73,7 @@ def family_member_to_dict(member):
         "relationship": member.relationship,
         "created_at": member.created_at.isoformat(),
         "updated_at": member.updated_at.isoformat(),
-        "record_count": member.records.count(),
+        "record_count": member.record_count,
     }
 
 
@@ -4,49 +4,104 @@ Backup API endpoints for secure data export
 
 import json
 import os
+import threading
+import uuid
 from datetime import datetime
 
-from flask import Blueprint, jsonify, send_file
+from flask import Blueprint, current_app, jsonify, send_file, url_for
 from flask_login import current_user, login_required
+from sqlalchemy import func, or_
 
-from ..utils.backup_manager import BackupManager
+from ..utils.backup_manager import COMPACT_JSON_SEPARATORS, BackupManager
+from ..utils.concurrency_limiter import concurrent_limit
 from ..utils.shared import log_security_event, monitor_performance
+from ..utils.unified_cache import cache_manager
 
 backup_api_bp = Blueprint("backup_api", __name__, url_prefix="/api/backup")
 
+# Backup payloads are mostly repetitive JSON, so the fastest deflate level
+# already captures most of the size reduction at a fraction of the CPU cost
+BACKUP_ZIP_COMPRESSLEVEL = 1
+
+# Backups covering more health records than this are built in the background
+BACKGROUND_BACKUP_RECORD_THRESHOLD = 500
+
+# Seconds a background backup job's status is kept for polling
+BACKUP_JOB_TIMEOUT = 3600
+
 
 @backup_api_bp.route("/create", methods=["POST"])
 @login_required
+@concurrent_limit(max_concurrent=1, resource="backup")
 @monitor_performance
 def create_backup():
     """
     Create a JSON backup of user's health data
     """
+    user = current_user._get_current_object()
+
     try:
         # Log backup request
         log_security_event(
             "backup_requested",
-            {"user_id": current_user.id, "timestamp": datetime.utcnow().isoformat()},
+            {"user_id": user.id, "timestamp": datetime.utcnow().isoformat()},
         )
 
-        # Create backup manager and backup data
-        backup_manager = BackupManager()
-        backup_path = backup_manager.create_backup(current_user.id, include_files=False)
-        
-        # Read the metadata to get backup info
-        metadata_path = os.path.join(backup_path, "metadata.json")
-        with open(metadata_path, 'r') as f:
-            backup_metadata = json.load(f)
+        user_id = user.id
+
+        # Large backups would hold this worker for the whole build, so hand
+        # them to a background thread and let the client poll for the result
+        data_summary = _get_data_summary(user_id)
+        if data_summary["health_records"] > BACKGROUND_BACKUP_RECORD_THRESHOLD:
+            # concurrent_limit releases its slot once this response is sent,
+            # so a job still running for this user is tracked separately and
+            # reported instead of starting another one
+            running_job_id = cache_manager.get(_active_backup_job_key(user_id))
+            if running_job_id is not None:
+                return (
+                    jsonify(
+                        {
+                            "success": True,
+                            "status": "pending",
+                            "status_url": url_for(
+                                "backup_api.backup_job_status", job_id=running_job_id
+                            ),
+                            "message": "Backup already in progress",
+                        }
+                    ),
+                    202,
+                )
+
+            job_id = uuid.uuid4().hex
+            cache_manager.set(
+                _backup_job_key(user_id, job_id),
+                {"status": "pending"},
+                timeout=BACKUP_JOB_TIMEOUT,
+            )
+            cache_manager.set(
+                _active_backup_job_key(user_id), job_id, timeout=BACKUP_JOB_TIMEOUT
+            )
+            threading.Thread(
+                target=_run_backup_job,
+                args=(current_app._get_current_object(), user_id, job_id),
+                daemon=True,
+            ).start()
+
+            return (
+                jsonify(
+                    {
+                        "success": True,
+                        "status": "pending",
+                        "status_url": url_for(
+                            "backup_api.backup_job_status", job_id=job_id
+                        ),
+                        "message": "Backup started",
+                    }
+                ),
+                202,
+            )
 
-        # Log successful backup creation
-        log_security_event(
-            "backup_created",
-            {
-                "user_id": current_user.id,
-                "backup_size": len(str(backup_metadata)),
-                "timestamp": datetime.utcnow().isoformat(),
-            },
-        )
+        backup_metadata = _create_backup_metadata(user_id)
 
         return jsonify(
             {
@@ -60,7 +115,7 @@ def create_backup():
         log_security_event(
             "backup_failed",
             {
-                "user_id": current_user.id,
+                "user_id": user.id,
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat(),
             },
@@ -69,23 +124,40 @@ def create_backup():
         return jsonify({"success": False, "error": "Failed to create backup"}), 500
 
 
+@backup_api_bp.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+@monitor_performance
+def backup_job_status(job_id):
+    """
+    Get the status of a background backup job
+    """
+    job = cache_manager.get(_backup_job_key(current_user.id, job_id))
+    if job is None:
+        return jsonify({"success": False, "error": "Backup job not found"}), 404
+
+    return jsonify({"success": job["status"] != "failed", **job})
+
+
 @backup_api_bp.route("/download", methods=["GET"])
 @login_required
+@concurrent_limit(max_concurrent=1, resource="backup")
 @monitor_performance
 def download_backup():
     """
     Download a compressed backup file
     """
+    user = current_user._get_current_object()
+
     try:
         # Log backup download request
         log_security_event(
             "backup_download_requested",
-            {"user_id": current_user.id, "timestamp": datetime.utcnow().isoformat()},
+            {"user_id": user.id, "timestamp": datetime.utcnow().isoformat()},
         )
 
         # Create backup manager and backup file
         backup_manager = BackupManager()
-        backup_path = backup_manager.create_backup(current_user.id, include_files=True)
+        backup_path = backup_manager.create_backup(user.id, include_files=True)
 
         # Create ZIP file from backup directory
         import tempfile
@@ -96,7 +168,12 @@ def download_backup():
         os.close(zip_fd)  # Close the file descriptor, we'll use the path
         
         try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            with zipfile.ZipFile(
+                zip_path,
+                'w',
+                zipfile.ZIP_DEFLATED,
+                compresslevel=BACKUP_ZIP_COMPRESSLEVEL,
+            ) as zipf:
                 # Add all files from backup directory to zip
                 for root, dirs, files in os.walk(backup_path):
                     for file in files:
@@ -106,16 +183,16 @@ def download_backup():
                         zipf.write(file_path, arcname)
             
             # Generate filename with timestamp
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            filename = f"health_backup_{current_user.username}_{timestamp}.zip"
+            now = datetime.utcnow()
+            filename = f"health_backup_{user.username}_{now.strftime('%Y%m%d_%H%M%S')}.zip"
 
             # Log successful backup download
             log_security_event(
                 "backup_downloaded",
                 {
-                    "user_id": current_user.id,
+                    "user_id": user.id,
                     "filename": filename,
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": now.isoformat(),
                 },
             )
 
@@ -138,7 +215,7 @@ def download_backup():
         log_security_event(
             "backup_download_failed",
             {
-                "user_id": current_user.id,
+                "user_id": user.id,
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat(),
             },
@@ -154,38 +231,17 @@ def backup_status():
     """
     Get backup status and information
     """
+    user = current_user._get_current_object()
+
     try:
-        # Calculate backup statistics
-        family_members_count = len(current_user.family_members)
-
-        # Get record counts (simplified for status)
-        from ..models import Appointment, HealthRecord
-
-        total_records = HealthRecord.query.filter_by(user_id=current_user.id).count()
-        family_member_ids = [fm.id for fm in current_user.family_members]
-        if family_member_ids:
-            total_records += HealthRecord.query.filter(
-                HealthRecord.family_member_id.in_(family_member_ids)
-            ).count()
-
-        total_appointments = Appointment.query.filter_by(
-            user_id=current_user.id
-        ).count()
-        if family_member_ids:
-            total_appointments += Appointment.query.filter(
-                Appointment.family_member_id.in_(family_member_ids)
-            ).count()
+        data_summary = _get_data_summary(user.id)
 
         status_info = {
             "user": {
-                "username": current_user.username,
-                "member_since": current_user.created_at.isoformat(),
-            },
-            "data_summary": {
-                "family_members": family_members_count,
-                "health_records": total_records,
-                "appointments": total_appointments,
+                "username": user.username,
+                "member_since": user.created_at.isoformat(),
             },
+            "data_summary": data_summary,
             "backup_info": {
                 "last_backup": "Never",  # In production, track this
                 "backup_available": True,
@@ -212,9 +268,11 @@ def list_backups():
     """
     List available backups for the current user
     """
+    user = current_user._get_current_object()
+
     try:
         backup_manager = BackupManager()
-        backups = backup_manager.list_backups(user_id=current_user.id)
+        backups = backup_manager.list_backups(user_id=user.id)
         
         return jsonify({
             "success": True,
@@ -233,6 +291,8 @@ def upload_backup():
     """
     Upload a backup file for restoration
     """
+    user = current_user._get_current_object()
+
     try:
         from flask import request
         import tempfile
@@ -253,7 +313,7 @@ def upload_backup():
         # Log upload attempt
         log_security_event(
             "backup_upload_attempted",
-            {"user_id": current_user.id, "filename": file.filename, "timestamp": datetime.utcnow().isoformat()},
+            {"user_id": user.id, "filename": file.filename, "timestamp": datetime.utcnow().isoformat()},
         )
         
         # Create temporary directory for extraction
@@ -292,7 +352,7 @@ def upload_backup():
             
             # Store backup in permanent location
             backup_manager = BackupManager()
-            backup_name = f"restored_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            backup_name = f"restored_{user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             permanent_backup_path = os.path.join(backup_manager.backup_dir, backup_name)
             
             # Copy extracted files to permanent location
@@ -300,21 +360,22 @@ def upload_backup():
             shutil.copytree(extract_dir, permanent_backup_path)
             
             # Update metadata with upload info
-            metadata['uploaded_by'] = current_user.id
-            metadata['upload_timestamp'] = datetime.utcnow().isoformat()
+            uploaded_at = datetime.utcnow().isoformat()
+            metadata['uploaded_by'] = user.id
+            metadata['upload_timestamp'] = uploaded_at
             metadata['original_filename'] = file.filename
             
             # Save updated metadata
             with open(os.path.join(permanent_backup_path, "metadata.json"), 'w') as f:
-                json.dump(metadata, f, indent=2)
+                json.dump(metadata, f, separators=COMPACT_JSON_SEPARATORS)
             
             log_security_event(
                 "backup_uploaded_successfully",
                 {
-                    "user_id": current_user.id,
+                    "user_id": user.id,
                     "backup_id": metadata.get('backup_id'),
                     "backup_path": backup_name,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": uploaded_at
                 },
             )
             
@@ -333,7 +394,7 @@ def upload_backup():
         log_security_event(
             "backup_upload_failed",
             {
-                "user_id": current_user.id,
+                "user_id": user.id,
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat(),
             },
@@ -348,6 +409,8 @@ def restore_backup():
     """
     Restore data from an uploaded backup
     """
+    user = current_user._get_current_object()
+
     try:
         from flask import request
         
@@ -360,7 +423,7 @@ def restore_backup():
         # Log restore attempt
         log_security_event(
             "backup_restore_attempted",
-            {"user_id": current_user.id, "backup_path": backup_path, "timestamp": datetime.utcnow().isoformat()},
+            {"user_id": user.id, "backup_path": backup_path, "timestamp": datetime.utcnow().isoformat()},
         )
         
         # Perform restoration
@@ -371,13 +434,13 @@ def restore_backup():
             return jsonify({"success": False, "error": "Backup not found"}), 404
         
         # Restore the backup (with user verification)
-        result = backup_manager.restore_backup(full_backup_path, user_id=current_user.id)
+        result = backup_manager.restore_backup(full_backup_path, user_id=user.id)
         
         if result['status'] == 'success':
             log_security_event(
                 "backup_restored_successfully",
                 {
-                    "user_id": current_user.id,
+                    "user_id": user.id,
                     "backup_path": backup_path,
                     "restored_records": result.get('database_restore', {}).get('total_restored', 0),
                     "restored_files": result.get('file_restore', {}).get('restored_files', 0),
@@ -394,7 +457,7 @@ def restore_backup():
             log_security_event(
                 "backup_restore_failed",
                 {
-                    "user_id": current_user.id,
+                    "user_id": user.id,
                     "backup_path": backup_path,
                     "error": result.get('message', 'Unknown error'),
                     "timestamp": datetime.utcnow().isoformat()
@@ -411,9 +474,112 @@ def restore_backup():
         log_security_event(
             "backup_restore_error",
             {
-                "user_id": current_user.id,
+                "user_id": user.id,
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat(),
             },
         )
         return jsonify({"success": False, "error": "Failed to restore backup"}), 500
+
+
+def _create_backup_metadata(user_id):
+    """Create a database-only backup for a user and return its metadata"""
+    backup_manager = BackupManager()
+    backup_path = backup_manager.create_backup(user_id, include_files=False)
+
+    # Read the metadata to get backup info
+    metadata_path = os.path.join(backup_path, "metadata.json")
+    with open(metadata_path, 'r') as f:
+        backup_metadata = json.load(f)
+
+    # Log successful backup creation
+    log_security_event(
+        "backup_created",
+        {
+            "user_id": user_id,
+            "backup_size": len(str(backup_metadata)),
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+    )
+
+    return backup_metadata
+
+
+def _backup_job_key(user_id, job_id):
+    """Cache key holding a background backup job's status"""
+    return f"user:{user_id}:backup_job:{job_id}"
+
+
+def _active_backup_job_key(user_id):
+    """Cache key holding the ID of a user's running background backup job"""
+    return f"user:{user_id}:active_backup_job"
+
+
+def _run_backup_job(app, user_id, job_id):
+    """Build a backup outside the request cycle and record the outcome"""
+    with app.app_context():
+        key = _backup_job_key(user_id, job_id)
+        try:
+            backup_metadata = _create_backup_metadata(user_id)
+            cache_manager.set(
+                key,
+                {"status": "complete", "data": backup_metadata},
+                timeout=BACKUP_JOB_TIMEOUT,
+            )
+        except Exception as e:
+            app.logger.error(f"Background backup {job_id} failed: {e}")
+            log_security_event(
+                "backup_failed",
+                {
+                    "user_id": user_id,
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            )
+            cache_manager.set(
+                key,
+                {"status": "failed", "error": "Failed to create backup"},
+                timeout=BACKUP_JOB_TIMEOUT,
+            )
+        finally:
+            # Let the user start another background backup
+            cache_manager.delete(_active_backup_job_key(user_id))
+
+
+def _get_data_summary(user_id):
+    """Count the family members, health records and appointments a backup covers"""
+    from ..models import Appointment, HealthRecord, db, user_family
+
+    family_member_ids = db.select(user_family.c.family_member_id).where(
+        user_family.c.user_id == user_id
+    )
+
+    def owned_count(model):
+        return (
+            db.select(func.count(model.id))
+            .where(
+                or_(
+                    model.user_id == user_id,
+                    model.family_member_id.in_(family_member_ids),
+                )
+            )
+            .scalar_subquery()
+        )
+
+    # All three counts come back in a single round trip
+    family_members, health_records, appointments = db.session.execute(
+        db.select(
+            db.select(func.count())
+            .select_from(user_family)
+            .where(user_family.c.user_id == user_id)
+            .scalar_subquery(),
+            owned_count(HealthRecord),
+            owned_count(Appointment),
+        )
+    ).one()
+
+    return {
+        "family_members": family_members,
+        "health_records": health_records,
+        "appointments": appointments,
+    }
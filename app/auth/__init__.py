@@ -448,9 +448,21 @@ def delete_account():
         user_email = current_user.email
 
         # Delete related records first (cascade should handle this, but being explicit)
-        from ..models import HealthRecord
+        from sqlalchemy import text
 
-        HealthRecord.query.filter_by(user_id=user_id).delete()
+        from ..models import HealthRecord
+        from ..utils.backup_manager import RECOUNT_FAMILY_RECORDS_SQL
+
+        user_records = HealthRecord.query.filter_by(user_id=user_id)
+        counted_in_family = db.session.query(
+            user_records.filter(HealthRecord.family_member_id.isnot(None)).exists()
+        ).scalar()
+        user_records.delete()
+
+        # The bulk delete skips the listeners that maintain
+        # FamilyMember.record_count, so recount if it removed any member's records
+        if counted_in_family:
+            db.session.execute(text(RECOUNT_FAMILY_RECORDS_SQL))
 
         # Remove user from family relationships
         current_user.family_members.clear()
@@ -167,6 +167,16 @@ class ProductionConfig(Config):
     # Use Redis for caching in production
     CACHE_TYPE = "RedisCache"
 
+    # Templates are not edited in production; avoid stat calls on every render
+    TEMPLATES_AUTO_RELOAD = False
+    # Directory for compiled template bytecode (defaults to a temp directory)
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get("JINJA_BYTECODE_CACHE_DIR")
+
+    # Serve uploads through the front-end server instead of the app: nginx
+    # via an internal location prefix, or X-Sendfile for Apache/lighttpd
+    UPLOADS_ACCEL_REDIRECT_PREFIX = os.environ.get("UPLOADS_ACCEL_REDIRECT_PREFIX")
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "false").lower() == "true"
+
     # Backup configuration
     BACKUP_ENABLED = os.environ.get("BACKUP_ENABLED", "true").lower() == "true"
     BACKUP_DIRECTORY = os.environ.get("BACKUP_DIRECTORY", "/var/backups/phrm")
@@ -4,6 +4,8 @@ Streamlined health record and document models.
 
 from datetime import datetime
 
+from sqlalchemy import Index, event, inspect, text
+
 from .base import db
 
 # Constants
@@ -148,3 +150,59 @@ class AISummary(db.Model):
 
     def __repr__(self) -> str:
         return f"<AISummary for record {self.health_record_id}>"
+
+
+# Add indexes for performance
+Index(
+    "idx_health_records_family_member_date",
+    HealthRecord.family_member_id,
+    HealthRecord.date.desc(),
+)
+Index(
+    "idx_health_records_related_condition_date",
+    HealthRecord.related_condition_id,
+    HealthRecord.date.desc(),
+)
+Index("idx_documents_record_filename", Document.health_record_id, Document.filename)
+
+
+# Keep FamilyMember.record_count in step with the health records table.
+# Bulk query deletes and updates (Query.delete / Query.update) and raw SQL
+# bypass these listeners, so such code paths must recount afterwards with
+# RECOUNT_FAMILY_RECORDS_SQL from app.utils.backup_manager.
+
+_ADJUST_FAMILY_RECORD_COUNT_SQL = text(
+    "UPDATE family_members SET record_count = record_count + :delta "
+    "WHERE id = :family_member_id"
+)
+
+
+def _adjust_family_record_count(connection, family_member_id, delta):
+    """Add delta to a family member's denormalized record count"""
+    if family_member_id is not None:
+        connection.execute(
+            _ADJUST_FAMILY_RECORD_COUNT_SQL,
+            {"delta": delta, "family_member_id": family_member_id},
+        )
+
+
+@event.listens_for(HealthRecord, "after_insert")
+def _count_inserted_record(_mapper, connection, target):
+    _adjust_family_record_count(connection, target.family_member_id, 1)
+
+
+@event.listens_for(HealthRecord, "after_delete")
+def _count_deleted_record(_mapper, connection, target):
+    _adjust_family_record_count(connection, target.family_member_id, -1)
+
+
+@event.listens_for(HealthRecord, "after_update")
+def _count_reassigned_record(_mapper, connection, target):
+    history = inspect(target).attrs.family_member_id.history
+    if not history.has_changes():
+        return
+
+    for family_member_id in history.deleted:
+        _adjust_family_record_count(connection, family_member_id, -1)
+    for family_member_id in history.added:
+        _adjust_family_record_count(connection, family_member_id, 1)
@@ -151,8 +151,19 @@ class ConditionProgressNote(db.Model):
 
 
 # Add indexes for performance
-Index("idx_medical_conditions_user", MedicalCondition.user_id)
-Index("idx_medical_conditions_family_member", MedicalCondition.family_member_id)
+# Owner plus the list ordering, so condition lists are read in index order
+Index(
+    "idx_medical_conditions_user_status_name",
+    MedicalCondition.user_id,
+    MedicalCondition.current_status,
+    MedicalCondition.condition_name,
+)
+Index(
+    "idx_medical_conditions_family_member_status_name",
+    MedicalCondition.family_member_id,
+    MedicalCondition.current_status,
+    MedicalCondition.condition_name,
+)
 Index("idx_medical_conditions_status", MedicalCondition.current_status)
 Index(
     "idx_condition_progress_condition_date",
@@ -120,13 +120,26 @@ class FamilyMember(db.Model):
     surgical_history = db.Column(db.Text, nullable=True)
     notes = db.Column(db.Text, nullable=True)
 
+    # Denormalized number of health records, maintained by HealthRecord
+    # insert/update/delete event listeners so listings need no COUNT query
+    record_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Hash of the medical context last sent to the AI, to skip unchanged updates
+    ai_context_hash = db.Column(db.String(32), nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
     # Relationships
-    records = db.relationship("HealthRecord", backref="family_member", lazy="dynamic")
+    # Record lists and dashboards show each record's family member, so batch
+    # those loads into one IN query instead of one query per record
+    records = db.relationship(
+        "HealthRecord",
+        backref=db.backref("family_member", lazy="selectin"),
+        lazy="dynamic",
+    )
 
     def get_complete_medical_context(self) -> str:
         """Get complete medical context for AI chat"""
@@ -4,7 +4,11 @@ Family Member Routes Module
 This module contains route handlers for family member management operations.
 """
 
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from flask import (
     Blueprint,
@@ -16,14 +20,80 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required
+from sqlalchemy import or_
+from sqlalchemy.orm import load_only, selectinload
 
 from ... import limiter
-from ...models import CurrentMedication, Document, FamilyMember, HealthRecord, db
+from ...models import (
+    AIAuditLog,
+    AISummary,
+    CurrentMedication,
+    Document,
+    FamilyMember,
+    HealthRecord,
+    db,
+    user_family,
+)
 from ...utils.shared import log_security_event, monitor_performance, sanitize_html
 from ..forms import FamilyMemberForm
 
+# Resolve the optional AI services once at import time
+try:
+    from ...ai.summarization import update_family_context
+
+    _AI_AVAILABLE = True
+except ImportError:
+    _AI_AVAILABLE = False
+
 # Constants for medical context validation
 MIN_MEANINGFUL_CONTEXT_LENGTH = 100
+MEDICAL_HISTORY_FIELDS = (
+    "family_medical_history",
+    "chronic_conditions",
+    "allergies",
+    "current_medications",
+)
+# Free-text fields that contribute to a family member's AI context
+AI_CONTEXT_FIELDS = (*MEDICAL_HISTORY_FIELDS, "surgical_history")
+
+# Family member form fields, grouped by how they are sanitized
+CHOICE_FIELDS = ("relationship", "gender", "blood_type")
+STRIP_FIELDS = (
+    "first_name",
+    "last_name",
+    "emergency_contact_name",
+    "emergency_contact_phone",
+    "primary_doctor",
+    "insurance_provider",
+)
+TEXT_FIELDS = (
+    "family_medical_history",
+    "surgical_history",
+    "current_medications",
+    "allergies",
+    "chronic_conditions",
+    "notes",
+)
+# Optional medication entry fields, besides the required medicine name
+MEDICATION_FIELDS = ("strength", "morning", "noon", "evening", "bedtime", "duration")
+
+# Columns shown by the family list page and its JSON format
+LIST_COLUMNS = (
+    FamilyMember.id,
+    FamilyMember.first_name,
+    FamilyMember.last_name,
+    FamilyMember.relationship,
+    FamilyMember.date_of_birth,
+    FamilyMember.record_count,
+)
+
+# Maximum number of threads removing document files in parallel
+MAX_FILE_DELETE_WORKERS = 4
+
+# Background pool removing deleted family members' document files
+_file_delete_pool = ThreadPoolExecutor(
+    max_workers=MAX_FILE_DELETE_WORKERS, thread_name_prefix="file-delete"
+)
 
 family_member_routes = Blueprint("family_member_routes", __name__)
 
@@ -48,25 +118,26 @@ def list_family():
     order = request.args.get('order', 'asc')
     search = request.args.get('search', '')
     
-    # Get family members directly from the current user relationship
-    # This is the safest approach that avoids relationship issues
-    family_members_query = current_user.family_members
-    
-    if isinstance(family_members_query, list):
-        # If it's already a list (eager loaded), create a query
-        member_ids = [m.id for m in family_members_query]
-        query = FamilyMember.query.filter(FamilyMember.id.in_(member_ids))
-    else:
-        # It's already a query
-        query = family_members_query
+    # Select the current user's family members through the association
+    # table, rather than loading the whole relationship to collect their IDs.
+    # Only the listed columns are loaded, skipping the medical history text
+    query = (
+        FamilyMember.query.options(load_only(*LIST_COLUMNS))
+        .join(user_family, user_family.c.family_member_id == FamilyMember.id)
+        .filter(user_family.c.user_id == current_user.id)
+    )
     
     # Apply search filter if provided
     if search:
         search_term = f"%{search}%"
+        # Each column has a trigram index on PostgreSQL, so the OR'd ILIKEs
+        # can be answered with a bitmap OR instead of a sequential scan
         query = query.filter(
-            (FamilyMember.first_name.ilike(search_term)) | 
-            (FamilyMember.last_name.ilike(search_term)) |
-            (FamilyMember.relationship.ilike(search_term))
+            or_(
+                FamilyMember.first_name.ilike(search_term),
+                FamilyMember.last_name.ilike(search_term),
+                FamilyMember.relationship.ilike(search_term),
+            )
         )
         
     # Apply sorting
@@ -80,49 +151,52 @@ def list_family():
             query = query.order_by(FamilyMember.relationship.desc())
         else:
             query = query.order_by(FamilyMember.relationship.asc())
+    elif sort == 'records':
+        if order == 'desc':
+            query = query.order_by(FamilyMember.record_count.desc())
+        else:
+            query = query.order_by(FamilyMember.record_count.asc())
     
-    # We can't directly sort by record count in SQL, so sorting by records is handled in JavaScript
-    
-    # Get paginated results if API mode, otherwise get all for client-side pagination
+    # Paginate in SQL for both the JSON and HTML views
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    family_members = pagination.items
+
     if request.args.get('format') == 'json':
-        paginated_members = query.paginate(page=page, per_page=per_page, error_out=False)
-        family_members = paginated_members.items
-        
         # Prepare response data
         response_data = {
-            'items': [],
+            'items': [
+                {
+                    'id': member.id,
+                    'first_name': member.first_name,
+                    'last_name': member.last_name,
+                    'relationship': member.relationship,
+                    'date_of_birth': member.date_of_birth.isoformat() if member.date_of_birth else None,
+                    'record_count': member.record_count
+                }
+                for member in family_members
+            ],
             'pagination': {
-                'page': paginated_members.page,
-                'per_page': paginated_members.per_page,
-                'total': paginated_members.total,
-                'pages': paginated_members.pages,
-                'has_next': paginated_members.has_next,
-                'has_prev': paginated_members.has_prev,
-                'next_num': paginated_members.next_num,
-                'prev_num': paginated_members.prev_num
+                'page': pagination.page,
+                'per_page': pagination.per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_next': pagination.has_next,
+                'has_prev': pagination.has_prev,
+                'next_num': pagination.next_num,
+                'prev_num': pagination.prev_num
             }
         }
-        
-        # Add family member data
-        for member in family_members:
-            response_data['items'].append({
-                'id': member.id,
-                'first_name': member.first_name,
-                'last_name': member.last_name,
-                'relationship': member.relationship,
-                'date_of_birth': member.date_of_birth.strftime('%Y-%m-%d') if member.date_of_birth else None,
-                'record_count': member.records.count()
-            })
             
         return response_data
     else:
-        # For HTML view, get all members for client-side pagination
-        family_members = query.all()
-        
         return render_template(
             "records/family_list.html",
             title="Family Members",
             family_members=family_members,
+            pagination=pagination,
+            search=search,
+            sort=sort,
+            order=order,
         )
 
 
@@ -149,11 +223,9 @@ def add_family_member():
             # Flush the session to get the family_member ID without committing
             db.session.flush()
             
-            # Process medication entries with the new family_member.id
-            medications = _process_medication_entries(form.current_medication_entries.data, family_member.id)
-            for medication in medications:
-                db.session.add(medication)
-                
+            # Insert medication entries with the new family_member.id
+            _insert_medication_entries(form.current_medication_entries.data, family_member.id)
+
             # Commit all changes in a single transaction
             db.session.commit()
             
@@ -161,25 +233,21 @@ def add_family_member():
             _handle_ai_context_update(family_member)
             
             # Log successful family member creation
-            has_medical_history = bool(
-                data["family_medical_history"] or 
-                data["chronic_conditions"] or 
-                data["allergies"] or 
-                data["current_medications"]
-            )
+            full_name = f"{data['first_name']} {data['last_name']}"
+            has_medical_history = any(data[field] for field in MEDICAL_HISTORY_FIELDS)
             
             log_security_event(
                 "family_member_created",
                 {
                     "user_id": current_user.id,
                     "family_member_id": family_member.id,
-                    "family_member_name": f"{data['first_name']} {data['last_name']}",
+                    "family_member_name": full_name,
                     "has_medical_history": has_medical_history,
                 },
             )
 
             flash(
-                f"Family member {data['first_name']} {data['last_name']} added successfully! Their medical history is now available to the AI.",
+                f"Family member {full_name} added successfully! Their medical history is now available to the AI.",
                 "success",
             )
             return redirect(url_for("records.family_member_routes.list_family"))
@@ -204,10 +272,13 @@ def add_family_member():
 @monitor_performance
 def edit_family_member(family_member_id):
     """Edit an existing family member"""
-    family_member = FamilyMember.query.get_or_404(family_member_id)
-
-    # Check if the family member belongs to the current user
-    if family_member not in current_user.family_members:
+    # Fetch the family member only if it belongs to the current user; the GET
+    # form needs the medication entries, so load them alongside it
+    load_options = ()
+    if request.method == "GET":
+        load_options = (selectinload(FamilyMember.current_medication_entries),)
+    family_member = _get_owned_family_member(family_member_id, *load_options)
+    if family_member is None:
         log_security_event(
             "unauthorized_family_member_edit_attempt",
             {
@@ -225,20 +296,24 @@ def edit_family_member(family_member_id):
             # Get sanitized form data
             data = _sanitize_form_data(form)
             
-            # Update family member attributes with sanitized data
-            for key, value in data.items():
-                setattr(family_member, key, value)
+            # Update family member attributes with sanitized data in one core
+            # UPDATE, then expire the instance so it reloads the new values
+            db.session.execute(
+                FamilyMember.__table__.update()
+                .where(FamilyMember.__table__.c.id == family_member_id)
+                .values(**data)
+            )
+            db.session.expire(family_member)
 
             # Handle current medication entries efficiently
-            # First delete existing entries
+            # First delete existing entries; none of them are loaded in this
+            # session, so skip synchronizing the session with the DELETE
             CurrentMedication.query.filter_by(
-                family_member_id=family_member.id
-            ).delete()
+                family_member_id=family_member_id
+            ).delete(synchronize_session=False)
 
-            # Then add new processed entries
-            medications = _process_medication_entries(form.current_medication_entries.data, family_member.id)
-            for medication in medications:
-                db.session.add(medication)
+            # Then insert the new processed entries
+            _insert_medication_entries(form.current_medication_entries.data, family_member_id)
 
             # Commit all changes
             db.session.commit()
@@ -291,10 +366,9 @@ def edit_family_member(family_member_id):
 def delete_family_member(family_member_id):
     """Delete a family member and all associated records"""
     try:
-        family_member = FamilyMember.query.get_or_404(family_member_id)
-
-        # Check if the family member belongs to the current user
-        if family_member not in current_user.family_members:
+        # Fetch the family member only if it belongs to the current user
+        family_member = _get_owned_family_member(family_member_id)
+        if family_member is None:
             log_security_event(
                 "unauthorized_family_member_delete_attempt",
                 {
@@ -307,37 +381,38 @@ def delete_family_member(family_member_id):
 
         # Get family member name for flash message
         member_name = f"{family_member.first_name} {family_member.last_name}"
+        associated_records_count = family_member.record_count
 
-        # Get associated health records to delete documents
-        associated_records = HealthRecord.query.filter_by(
-            family_member_id=family_member.id
-        ).all()
-
-        # Delete files associated with health records
-        deleted_files = []
-        for record in associated_records:
-            documents = Document.query.filter_by(health_record_id=record.id).all()
-            for doc in documents:
-                try:
-                    if os.path.exists(doc.file_path):
-                        os.remove(doc.file_path)
-                        deleted_files.append(doc.filename)
-                    else:
-                        current_app.logger.warning(
-                            f"File not found on disk: {doc.file_path}"
-                        )
-                except (FileNotFoundError, PermissionError) as e:
-                    current_app.logger.error(
-                        f"Error deleting file {doc.file_path}: {e}"
-                    )
+        # Collect the files of the associated health records, fetching just
+        # the paths and names of every record's documents in a single query
+        documents = (
+            db.session.query(
+                Document.health_record_id, Document.file_path, Document.filename
+            )
+            .join(HealthRecord, Document.health_record_id == HealthRecord.id)
+            .filter(HealthRecord.family_member_id == family_member.id)
+            .all()
+        )
 
         # Clean up all AI data efficiently
-        _clean_ai_data_for_family_member_deletion(family_member.id, associated_records)
+        _clean_ai_data_for_family_member_deletion(family_member.id)
 
         # Delete family member (cascade will delete associated records and documents)
         db.session.delete(family_member)
         db.session.commit()
 
+        # Remove the files only once the deletion is committed, off the
+        # request thread so slow disks don't hold up the response. Files are
+        # stored per record under the upload folder, as serve_upload reads them
+        logger = current_app.logger
+        upload_folder = current_app.config["UPLOAD_FOLDER"]
+        for doc in documents:
+            _file_delete_pool.submit(
+                _remove_document_file,
+                logger,
+                os.path.join(upload_folder, str(doc.health_record_id), doc.file_path),
+            )
+
         # Log successful family member deletion
         log_security_event(
             "family_member_deleted",
@@ -345,8 +420,8 @@ def delete_family_member(family_member_id):
                 "user_id": current_user.id,
                 "family_member_id": family_member_id,
                 "family_member_name": member_name,
-                "deleted_files": deleted_files,
-                "associated_records_count": len(associated_records),
+                "queued_files": [doc.filename for doc in documents],
+                "associated_records_count": associated_records_count,
             },
         )
 
@@ -370,10 +445,9 @@ def delete_family_member(family_member_id):
 @monitor_performance
 def view_family_member(family_member_id):
     """View a specific family member's details"""
-    family_member = FamilyMember.query.get_or_404(family_member_id)
-
-    # Check if the family member belongs to the current user
-    if family_member not in current_user.family_members:
+    # Fetch the family member only if it belongs to the current user
+    family_member = _get_owned_family_member(family_member_id)
+    if family_member is None:
         log_security_event(
             "unauthorized_family_member_access_attempt",
             {
@@ -385,8 +459,19 @@ def view_family_member(family_member_id):
         return redirect(url_for("records.family_member_routes.list_family"))
 
     # Get recent health records for this family member - use efficient query
+    # served by the (family_member_id, date DESC) index, loading only the
+    # columns the profile and quick view show (title falls back to diagnosis)
     recent_records = (
         HealthRecord.query
+        .options(
+            load_only(
+                HealthRecord.id,
+                HealthRecord.date,
+                HealthRecord.chief_complaint,
+                HealthRecord.diagnosis,
+                HealthRecord.doctor,
+            )
+        )
         .filter_by(family_member_id=family_member.id)
         .order_by(HealthRecord.date.desc())
         .limit(10)
@@ -405,14 +490,15 @@ def view_family_member(family_member_id):
     # Check if JSON format is requested (for quick view)
     if request.args.get('format') == 'json':
         # Prepare a simplified version of data for quick view
-        recent_records_data = []
-        for record in recent_records:
-            recent_records_data.append({
+        recent_records_data = [
+            {
                 'id': record.id,
-                'date': record.date.strftime('%Y-%m-%d') if record.date else None,
+                'date': record.date.date().isoformat() if record.date else None,
                 'chief_complaint': record.chief_complaint[:50] if record.chief_complaint else 'Medical Record',
                 'doctor': record.doctor
-            })
+            }
+            for record in recent_records
+        ]
         
         # Check if family member has medication entries
         has_medications = len(family_member.current_medication_entries) > 0 or bool(family_member.current_medications)
@@ -424,7 +510,7 @@ def view_family_member(family_member_id):
                 'first_name': family_member.first_name,
                 'last_name': family_member.last_name,
                 'relationship': family_member.relationship,
-                'date_of_birth': family_member.date_of_birth.strftime('%Y-%m-%d') if family_member.date_of_birth else None,
+                'date_of_birth': family_member.date_of_birth.isoformat() if family_member.date_of_birth else None,
                 'gender': family_member.gender,
                 'blood_type': family_member.blood_type,
                 'allergies': family_member.allergies,
@@ -461,15 +547,34 @@ def _sanitize_form_input(value, strip=True, allow_none=True):
     Returns:
         Sanitized value (or None if input is falsy and allow_none is True)
     """
-    if not value and allow_none:
-        return None
-    if not value and not allow_none:
-        return ""
+    if strip and hasattr(value, "strip"):
+        value = value.strip()
+
+    # Skip the HTML sanitizer entirely for empty or whitespace-only input,
+    # including unstripped free-text fields, which keep their inner spacing
+    if not value or (hasattr(value, "isspace") and value.isspace()):
+        return None if allow_none else ""
 
-    result = sanitize_html(value.strip() if strip and hasattr(value, "strip") else value)
+    result = sanitize_html(value)
     return result
 
 
+@lru_cache(maxsize=1024)
+def _sanitize_choice(value):
+    """Sanitize a short fixed-choice value, memoized across requests
+
+    Fields like gender, blood type and relationship only ever take a handful
+    of distinct values, so their sanitized form is cached.
+
+    Args:
+        value: The value to sanitize
+
+    Returns:
+        Sanitized value (or None if input is empty)
+    """
+    return _sanitize_form_input(value, strip=True)
+
+
 def _sanitize_form_data(form):
     """Extract and sanitize all common form fields
 
@@ -479,24 +584,41 @@ def _sanitize_form_data(form):
     Returns:
         Dict containing sanitized form data
     """
-    return {
-        "first_name": _sanitize_form_input(form.first_name.data, strip=True),
-        "last_name": _sanitize_form_input(form.last_name.data, strip=True),
-        "relationship": _sanitize_form_input(form.relationship.data, strip=True),
-        "gender": _sanitize_form_input(form.gender.data, strip=True),
-        "blood_type": _sanitize_form_input(form.blood_type.data, strip=True),
-        "family_medical_history": _sanitize_form_input(form.family_medical_history.data, strip=False),
-        "surgical_history": _sanitize_form_input(form.surgical_history.data, strip=False),
-        "current_medications": _sanitize_form_input(form.current_medications.data, strip=False),
-        "allergies": _sanitize_form_input(form.allergies.data, strip=False),
-        "chronic_conditions": _sanitize_form_input(form.chronic_conditions.data, strip=False),
-        "emergency_contact_name": _sanitize_form_input(form.emergency_contact_name.data, strip=True),
-        "emergency_contact_phone": _sanitize_form_input(form.emergency_contact_phone.data, strip=True),
-        "primary_doctor": _sanitize_form_input(form.primary_doctor.data, strip=True),
-        "insurance_provider": _sanitize_form_input(form.insurance_provider.data, strip=True),
-        "notes": _sanitize_form_input(form.notes.data, strip=False),
-        "date_of_birth": form.date_of_birth.data  # No sanitization needed for date objects
-    }
+    data = {field: _sanitize_choice(getattr(form, field).data) for field in CHOICE_FIELDS}
+    data.update(
+        (field, _sanitize_form_input(getattr(form, field).data, strip=True))
+        for field in STRIP_FIELDS
+    )
+    data.update(
+        (field, _sanitize_form_input(getattr(form, field).data, strip=False))
+        for field in TEXT_FIELDS
+    )
+    data["date_of_birth"] = form.date_of_birth.data  # No sanitization needed for date objects
+    return data
+
+
+def _get_owned_family_member(family_member_id, *options):
+    """Fetch a family member if it belongs to the current user
+
+    Ownership is checked in the same indexed query through the user_family
+    association table, instead of loading every family member of the user.
+
+    Args:
+        family_member_id: ID of the family member to fetch
+        *options: Loader options (e.g. selectinload) to apply to the query
+
+    Returns:
+        The FamilyMember, or None if it does not exist or is not the user's
+    """
+    return (
+        FamilyMember.query.options(*options)
+        .join(user_family, user_family.c.family_member_id == FamilyMember.id)
+        .filter(
+            user_family.c.user_id == current_user.id,
+            FamilyMember.id == family_member_id,
+        )
+        .first()
+    )
 
 
 def _process_medication_entries(entries, family_member_id):
@@ -507,137 +629,186 @@ def _process_medication_entries(entries, family_member_id):
         family_member_id: ID of the family member these medications belong to
 
     Returns:
-        List of CurrentMedication objects ready to be added to the database
+        List of current_medications row dicts ready to be inserted
     """
-    result = []
-
-    for entry in entries:
-        if entry and entry.get("medicine"):
-            medication = CurrentMedication(
-                family_member_id=family_member_id,
-                medicine=_sanitize_form_input(entry["medicine"]),
-                strength=_sanitize_form_input(entry.get("strength")),
-                morning=_sanitize_form_input(entry.get("morning")),
-                noon=_sanitize_form_input(entry.get("noon")),
-                evening=_sanitize_form_input(entry.get("evening")),
-                bedtime=_sanitize_form_input(entry.get("bedtime")),
-                duration=_sanitize_form_input(entry.get("duration"))
-            )
-            result.append(medication)
+    return [
+        _build_medication_row(entry, family_member_id)
+        for entry in entries
+        if entry and entry.get("medicine")
+    ]
 
-    return result
+
+def _build_medication_row(entry, family_member_id):
+    """Build a sanitized current_medications row from one form entry
+
+    Args:
+        entry: Medication form entry data with a medicine name
+        family_member_id: ID of the family member the medication belongs to
+
+    Returns:
+        Dict of column values for the current_medications table
+    """
+    row = {
+        "family_member_id": family_member_id,
+        "medicine": _sanitize_form_input(entry["medicine"]),
+    }
+    for field in MEDICATION_FIELDS:
+        row[field] = _sanitize_form_input(entry.get(field))
+    return row
+
+
+def _insert_medication_entries(entries, family_member_id):
+    """Insert a family member's medication entries in a single statement
+
+    The rows are write-only here, so they go through one multi-row core
+    INSERT instead of being tracked as ORM objects by the session.
+
+    Args:
+        entries: Medication form entries
+        family_member_id: ID of the family member these medications belong to
+
+    Returns:
+        Number of medication entries inserted
+    """
+    medications = _process_medication_entries(entries, family_member_id)
+    if medications:
+        db.session.execute(CurrentMedication.__table__.insert(), medications)
+    return len(medications)
 
 
 def _handle_ai_context_update(family_member):
     """Update AI context safely for a family member
 
+    The cheap checks run here; building the context and calling the AI
+    providers happen in a background thread so the response doesn't wait.
+
     Args:
         family_member: The FamilyMember object to update AI context for
     """
-    try:
-        # Import AI services here to avoid circular imports
-        from ...ai.summarization import update_family_context
-
-        # Get complete medical context for this family member
-        medical_context = family_member.get_complete_medical_context()
-
-        # Update AI context if we have medical information
-        if medical_context and len(medical_context.strip()) > MIN_MEANINGFUL_CONTEXT_LENGTH:
-            update_family_context(current_user.id, family_member.id, medical_context)
-            current_app.logger.info(
-                f"Updated AI context for family member {family_member.id}"
-            )
-        else:
-            current_app.logger.info(
-                f"No significant medical history to add to AI context for family member {family_member.id}"
-            )
+    # Without medical history or health records the context can't be
+    # meaningful, so skip building it (and the records query it runs)
+    if not family_member.record_count and not any(
+        getattr(family_member, field, None) for field in AI_CONTEXT_FIELDS
+    ):
+        current_app.logger.info(
+            f"No significant medical history to add to AI context for family member {family_member.id}"
+        )
+        return None
 
-    except ImportError:
+    if not _AI_AVAILABLE:
         current_app.logger.warning(
             "AI summarization module not available - skipping context update"
         )
-    except Exception as e:
-        current_app.logger.error(
-            f"Failed to update AI context for family member {family_member.id}: {e}"
-        )
-        # Return exception but don't raise - we don't want to fail the transaction
-        return e
+        return None
 
+    threading.Thread(
+        target=_update_ai_context_in_background,
+        args=(current_app._get_current_object(), current_user.id, family_member.id),
+        daemon=True,
+    ).start()
     return None
 
 
+def _update_ai_context_in_background(app, user_id, family_member_id):
+    """Send a family member's medical context to the AI outside the request"""
+    with app.app_context():
+        try:
+            family_member = db.session.get(FamilyMember, family_member_id)
+            if family_member is None:
+                return
+
+            # Get complete medical context for this family member
+            medical_context = family_member.get_complete_medical_context()
+
+            # Update AI context if we have medical information
+            if medical_context and len(medical_context.strip()) > MIN_MEANINGFUL_CONTEXT_LENGTH:
+                # Skip the AI round trip when the context matches the last
+                # update, e.g. after an edit that only changed contact details
+                context_hash = hashlib.blake2b(
+                    medical_context.encode(), digest_size=16
+                ).hexdigest()
+                if context_hash == family_member.ai_context_hash:
+                    app.logger.info(
+                        f"AI context unchanged for family member {family_member_id}"
+                    )
+                    return
+
+                if update_family_context(user_id, family_member_id, medical_context):
+                    family_member.ai_context_hash = context_hash
+                    db.session.commit()
+                app.logger.info(f"Updated AI context for family member {family_member_id}")
+            else:
+                app.logger.info(
+                    f"No significant medical history to add to AI context for family member {family_member_id}"
+                )
+
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(
+                f"Failed to update AI context for family member {family_member_id}: {e}"
+            )
+
+
 def _populate_family_member_form(form, family_member):
     """Populate form with existing family member data"""
-    # Basic fields
-    form.first_name.data = family_member.first_name
-    form.last_name.data = family_member.last_name
-    form.date_of_birth.data = family_member.date_of_birth
-    form.relationship.data = family_member.relationship
-    form.gender.data = family_member.gender
-    form.blood_type.data = family_member.blood_type
-
-    # Medical history fields
-    form.family_medical_history.data = family_member.family_medical_history
-    form.surgical_history.data = family_member.surgical_history
-    form.current_medications.data = family_member.current_medications
-    form.allergies.data = family_member.allergies
-    form.chronic_conditions.data = family_member.chronic_conditions
-
-    # Contact information
-    form.emergency_contact_name.data = family_member.emergency_contact_name
-    form.emergency_contact_phone.data = family_member.emergency_contact_phone
-    form.primary_doctor.data = family_member.primary_doctor
-    form.insurance_provider.data = family_member.insurance_provider
-    form.notes.data = family_member.notes
-
-    # Populate current medication entries
-    current_medication_entries = family_member.current_medication_entries
-    form.current_medication_entries.entries.clear()
-
-    for entry in current_medication_entries:
-        entry_form = form.current_medication_entries.append_entry()
-        entry_form.medicine.data = entry.medicine
-        entry_form.strength.data = entry.strength
-        entry_form.morning.data = entry.morning
-        entry_form.noon.data = entry.noon
-        entry_form.evening.data = entry.evening
-        entry_form.bedtime.data = entry.bedtime
-        entry_form.duration.data = entry.duration
-
-
-def _clean_ai_data_for_family_member_deletion(family_member_id, associated_records):
+    for field in (*CHOICE_FIELDS, *STRIP_FIELDS, *TEXT_FIELDS, "date_of_birth"):
+        getattr(form, field).data = getattr(family_member, field)
+
+    # Populate current medication entries in one pass; each entry subform
+    # reads its fields straight from the matching CurrentMedication attributes
+    form.current_medication_entries.process(
+        None, data=list(family_member.current_medication_entries)
+    )
+
+
+def _remove_document_file(logger, file_path):
+    """Remove a deleted document's file from disk in the background
+
+    Runs in the file deletion pool, outside the request context, so it logs
+    through the application logger passed in by the caller.
+
+    Args:
+        logger: Application logger to report problems to
+        file_path: Full path of the file to remove
+    """
+    try:
+        os.remove(file_path)
+        logger.info(f"Deleted file of removed family member: {file_path}")
+    except FileNotFoundError:
+        logger.warning(f"File not found on disk: {file_path}")
+    except OSError as e:
+        logger.error(f"Error deleting file {file_path}: {e}")
+
+
+def _clean_ai_data_for_family_member_deletion(family_member_id):
     """Clean up all AI-related data for a family member being deleted
 
     Args:
         family_member_id: ID of the family member being deleted
-        associated_records: List of associated health records
 
     Returns:
         True if successful, False if errors occurred
     """
     success = True
 
-    # First clean up any health record AI summaries
-    for record in associated_records:
-        try:
-            from ...models.core.health_record import AISummary
-            AISummary.query.filter_by(health_record_id=record.id).delete()
-        except ImportError:
-            current_app.logger.warning("Could not import AISummary model")
-            success = False
-        except Exception as e:
-            current_app.logger.error(f"Error cleaning up AI summaries: {e}")
-            success = False
+    # First clean up the AI summaries of every health record in one statement,
+    # selecting the records in a subquery rather than loading them
+    try:
+        record_ids = db.select(HealthRecord.id).where(
+            HealthRecord.family_member_id == family_member_id
+        )
+        AISummary.query.filter(AISummary.health_record_id.in_(record_ids)).delete(
+            synchronize_session=False
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error cleaning up AI summaries: {e}")
+        success = False
 
     # Then clean up any AI audit logs referencing this family member
     try:
-        from ...models.ai_audit.audit_log import AIAuditLog
         AIAuditLog.query.filter_by(family_member_id=family_member_id).update(
-            {"family_member_id": None}
+            {"family_member_id": None}, synchronize_session=False
         )
-    except ImportError:
-        current_app.logger.warning("Could not import AIAuditLog model")
-        success = False
     except Exception as e:
         current_app.logger.error(f"Error cleaning up AI audit logs: {e}")
         success = False
@@ -6,16 +6,30 @@ This module contains route handlers for file upload and download operations.
 
 import mimetypes
 import os
+import re
+from functools import lru_cache
 
 from flask import Blueprint, abort, current_app, send_from_directory
 from flask_login import current_user, login_required
 
 from ... import limiter
-from ...models import Document, HealthRecord
+from ...models import Document, HealthRecord, db, user_family
 from ...utils.shared import log_security_event, monitor_performance
 
 file_routes = Blueprint("file_routes", __name__)
 
+# MIME types for the document formats users upload, checked before mimetypes
+FILE_MIMETYPES = {
+    ".pdf": "application/pdf",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+
+# Parent directory references and path separators are never valid in an
+# uploaded filename
+_UNSAFE_FILENAME_PATTERN = re.compile(r"\.\.|[/\\]")
+
 
 @file_routes.route("/uploads/<int:record_id>/<filename>")
 @login_required
@@ -24,34 +38,12 @@ file_routes = Blueprint("file_routes", __name__)
 def serve_upload(record_id, filename):
     """Securely serve uploaded files"""
     try:
-        # Validate filename security
-        if not _validate_filename_security(filename, record_id):
-            abort(404)
-
-        # Get the record to check permissions
-        record = HealthRecord.query.get_or_404(record_id)
-
-        # Check file access permissions
-        if not _check_file_access_permission(record):
-            _handle_unauthorized_file_access(record_id, filename, record)
-
-        # Verify document belongs to record
-        if not _verify_document_belongs_to_record(record_id, filename):
-            abort(404)
-
-        # Check if file exists on disk
-        file_directory = os.path.join(
-            current_app.config["UPLOAD_FOLDER"], str(record_id)
-        )
-        file_path = os.path.join(file_directory, filename)
-
-        # Validate file path security
-        if not _validate_file_path_security(
-            file_path, file_directory, record_id, filename
-        ):
-            abort(404)
+        # Validate the request and resolve the file it refers to
+        file_directory, file_path = _authorize_file_request(record_id, filename)
 
-        if not os.path.exists(file_path):
+        try:
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
             current_app.logger.error(f"File not found on disk: {file_path}")
             abort(404)
 
@@ -65,10 +57,17 @@ def serve_upload(record_id, filename):
                 "user_id": current_user.id,
                 "record_id": record_id,
                 "filename": filename,
-                "file_size": os.path.getsize(file_path),
+                "file_size": file_size,
             },
         )
 
+        # Let the front-end server stream the file when it is set up to
+        accel_redirect_prefix = current_app.config.get("UPLOADS_ACCEL_REDIRECT_PREFIX")
+        if accel_redirect_prefix:
+            return _accel_redirect_response(
+                accel_redirect_prefix, record_id, filename, mimetype
+            )
+
         try:
             return send_from_directory(
                 directory=file_directory,
@@ -88,9 +87,39 @@ def serve_upload(record_id, filename):
 # Helper functions for file operations
 
 
+def _authorize_file_request(record_id, filename):
+    """Run every access check for a file request, aborting with 404 on failure
+
+    Returns:
+        Tuple of the record's upload directory and the requested file's path
+    """
+    # Validate filename security
+    if not _validate_filename_security(filename, record_id):
+        abort(404)
+
+    # Verify document belongs to record, fetching the record's owners
+    # in the same query to check permissions
+    record = _get_document_access(record_id, filename)
+    if record is None:
+        abort(404)
+
+    # Check file access permissions
+    if not _check_file_access_permission(record):
+        _handle_unauthorized_file_access(record_id, filename, record)
+
+    file_directory = os.path.join(current_app.config["UPLOAD_FOLDER"], str(record_id))
+    file_path = os.path.join(file_directory, filename)
+
+    # Validate file path security
+    if not _validate_file_path_security(file_path, record_id, filename):
+        abort(404)
+
+    return file_directory, file_path
+
+
 def _validate_filename_security(filename, record_id):
     """Validate filename for security issues"""
-    if not filename or ".." in filename or "/" in filename or "\\" in filename:
+    if not filename or _UNSAFE_FILENAME_PATTERN.search(filename):
         log_security_event(
             "file_access_path_traversal_attempt",
             {
@@ -107,7 +136,7 @@ def _check_file_access_permission(record):
     """Check if current user has permission to access files from this record"""
     if record.user_id == current_user.id:
         return True
-    if record.family_member_id and record.family_member in current_user.family_members:
+    if record.family_member_id and record.owns_family_member:
         return True
     return False
 
@@ -127,15 +156,35 @@ def _handle_unauthorized_file_access(record_id, filename, record):
     abort(404)  # Return 404 instead of 403 to avoid information disclosure
 
 
-def _verify_document_belongs_to_record(record_id, filename):
-    """Verify that the requested file belongs to this record"""
-    document = (
-        Document.query.filter_by(health_record_id=record_id)
-        .filter(Document.file_path.endswith(filename))
+def _get_document_access(record_id, filename):
+    """Fetch what is needed to authorize a file request in a single query
+
+    Verifies that the requested file belongs to this record and returns the
+    record's owner, family member, and whether the current user has that
+    family member (via the user_family association table).
+
+    Returns:
+        Row with user_id, family_member_id and owns_family_member, or None
+        if the record has no such document
+    """
+    owns_family_member = (
+        db.exists()
+        .where(
+            user_family.c.user_id == current_user.id,
+            user_family.c.family_member_id == HealthRecord.family_member_id,
+        )
+        .label("owns_family_member")
+    )
+    record = (
+        db.session.query(
+            HealthRecord.user_id, HealthRecord.family_member_id, owns_family_member
+        )
+        .join(Document, Document.health_record_id == HealthRecord.id)
+        .filter(HealthRecord.id == record_id, Document.filename == filename)
         .first()
     )
 
-    if not document:
+    if record is None:
         log_security_event(
             "file_access_invalid_document",
             {
@@ -144,14 +193,15 @@ def _verify_document_belongs_to_record(record_id, filename):
                 "filename": filename,
             },
         )
-        return False
-    return True
+    return record
 
 
-def _validate_file_path_security(file_path, file_directory, record_id, filename):
+def _validate_file_path_security(file_path, record_id, filename):
     """Validate file path for directory traversal attacks"""
     real_file_path = os.path.realpath(file_path)
-    real_upload_dir = os.path.realpath(file_directory)
+    real_upload_dir = os.path.join(
+        current_app.config["REAL_UPLOAD_FOLDER"], str(record_id), ""
+    )
 
     if not real_file_path.startswith(real_upload_dir):
         log_security_event(
@@ -167,16 +217,30 @@ def _validate_file_path_security(file_path, file_directory, record_id, filename)
     return True
 
 
+def _accel_redirect_response(prefix, record_id, filename, mimetype):
+    """Hand an authorized file to nginx to send from an internal location
+
+    The response body is empty; nginx replaces it with the file found at
+    prefix/record_id/filename, so file bytes never pass through the app.
+    """
+    response = current_app.response_class(mimetype=mimetype)
+    response.headers["X-Accel-Redirect"] = (
+        f"{prefix.rstrip('/')}/{record_id}/{filename}"
+    )
+    return response
+
+
 def _determine_file_mimetype(filename):
     """Determine appropriate MIME type for file"""
-    mimetype = mimetypes.guess_type(filename)[0]
-    if not mimetype:
-        if filename.lower().endswith(".pdf"):
-            mimetype = "application/pdf"
-        elif filename.lower().endswith((".jpg", ".jpeg")):
-            mimetype = "image/jpeg"
-        elif filename.lower().endswith(".png"):
-            mimetype = "image/png"
-        else:
-            mimetype = "application/octet-stream"
-    return mimetype
+    extension = os.path.splitext(filename)[1].lower()
+    return FILE_MIMETYPES.get(extension) or _guess_mimetype_for_extension(extension)
+
+
+@lru_cache(maxsize=128)
+def _guess_mimetype_for_extension(extension):
+    """Look up a MIME type for extensions outside FILE_MIMETYPES
+
+    Cached per extension: stored filenames carry a unique prefix, so they
+    rarely repeat, but their extensions do.
+    """
+    return mimetypes.guess_type(f"file{extension}")[0] or "application/octet-stream"
@@ -5,8 +5,14 @@ This module contains route handlers for medical condition management,
 including CRUD operations and AI-powered analysis.
 """
 
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
 from flask import (
     Blueprint,
+    abort,
     current_app,
     flash,
     jsonify,
@@ -16,17 +22,105 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required
+from sqlalchemy import or_
+from sqlalchemy.orm import load_only
 
 from ... import limiter
-from ...models import ConditionProgressNote, FamilyMember, MedicalCondition, db
+from ...models import (
+    ConditionProgressNote,
+    HealthRecord,
+    MedicalCondition,
+    db,
+    user_family,
+)
+from ...utils.ai_helpers import DEMO_MODEL_NAME
 from ...utils.medical_condition_ai import (
     analyze_condition_progression,
     get_condition_insights,
 )
 from ...utils.performance_monitor import monitor_performance
 from ...utils.security_utils import log_security_event, sanitize_html
+from ...utils.unified_cache import cache_manager
 from ..forms import ConditionProgressForm, MedicalConditionForm
 
+# Medical condition form fields: free text sanitized (empty becomes None),
+# and choice/date/number fields stored as submitted
+CONDITION_TEXT_FIELDS = (
+    "icd_code",
+    "diagnosing_doctor",
+    "current_treatments",
+    "treatment_goals",
+    "prognosis",
+    "monitoring_plan",
+    "functional_limitations",
+    "notes",
+    "external_resources",
+)
+CONDITION_FIELDS = (
+    "condition_category",
+    "diagnosed_date",
+    "current_status",
+    "severity",
+    "treatment_effectiveness",
+    "next_review_date",
+    "quality_of_life_impact",
+    "work_impact",
+)
+
+# Progress note form fields, grouped the same way
+PROGRESS_NOTE_TEXT_FIELDS = (
+    "symptoms_changes",
+    "treatment_changes",
+    "vital_measurements",
+    "clinical_observations",
+    "doctor_notes",
+    "patient_reported_outcomes",
+)
+PROGRESS_NOTE_FIELDS = (
+    "note_date",
+    "progress_status",
+    "pain_level",
+    "functional_score",
+    "recorded_by",
+)
+
+# Columns shown by the conditions list, plus the owner used for grouping
+CONDITION_LIST_COLUMNS = (
+    MedicalCondition.id,
+    MedicalCondition.family_member_id,
+    MedicalCondition.condition_name,
+    MedicalCondition.condition_category,
+    MedicalCondition.icd_code,
+    MedicalCondition.current_status,
+    MedicalCondition.severity,
+    MedicalCondition.quality_of_life_impact,
+    MedicalCondition.created_at,
+    MedicalCondition.updated_at,
+)
+
+# Conditions shown per page when a family member's block is expanded
+FAMILY_CONDITIONS_PER_PAGE = 10
+
+# Seconds a background AI job's status is kept for polling
+AI_JOB_TIMEOUT = 3600
+
+# Seconds a condition's AI analysis is reused; its cache key changes whenever
+# the condition, its progress notes or its related records change
+AI_ANALYSIS_CACHE_TIMEOUT = 86400
+
+# Seconds condition insights are reused; the key tracks the person's
+# conditions and progress notes, while this bounds staleness from other
+# profile edits that feed the insights prompt
+AI_INSIGHTS_CACHE_TIMEOUT = 3600
+
+# Maximum number of AI analyses calling providers at the same time
+MAX_AI_JOB_WORKERS = 4
+
+# Background pool running condition AI analyses
+_ai_job_pool = ThreadPoolExecutor(
+    max_workers=MAX_AI_JOB_WORKERS, thread_name_prefix="condition-ai"
+)
+
 medical_conditions_routes = Blueprint("medical_conditions_routes", __name__)
 
 
@@ -40,37 +134,83 @@ def list_conditions():
 
     # Get user's conditions
     user_conditions = (
-        MedicalCondition.query.filter_by(user_id=current_user.id)
+        MedicalCondition.query.options(load_only(*CONDITION_LIST_COLUMNS))
+        .filter_by(user_id=current_user.id)
         .order_by(
             MedicalCondition.current_status.asc(), MedicalCondition.condition_name.asc()
         )
         .paginate(page=page, per_page=per_page, error_out=False)
     )
 
-    # Get family member conditions
-    family_conditions = []
-    for family_member in current_user.family_members:
-        conditions = (
-            MedicalCondition.query.filter_by(family_member_id=family_member.id)
-            .order_by(
-                MedicalCondition.current_status.asc(),
-                MedicalCondition.condition_name.asc(),
+    # Count family members' conditions per member and status in one query;
+    # each member's conditions are fetched page by page when expanded
+    family_members = current_user.family_members
+    conditions_count_by_member = defaultdict(int)
+    family_status_counts = defaultdict(int)
+    if family_members:
+        status_counts = (
+            db.session.query(
+                MedicalCondition.family_member_id,
+                MedicalCondition.current_status,
+                db.func.count(MedicalCondition.id),
             )
+            .filter(
+                MedicalCondition.family_member_id.in_([m.id for m in family_members])
+            )
+            .group_by(MedicalCondition.family_member_id, MedicalCondition.current_status)
             .all()
         )
-        if conditions:
-            family_conditions.append(
-                {"family_member": family_member, "conditions": conditions}
-            )
+        for family_member_id, status, count in status_counts:
+            conditions_count_by_member[family_member_id] += count
+            family_status_counts[status] += count
+
+    family_conditions = [
+        {
+            "family_member": family_member,
+            "conditions_count": conditions_count_by_member[family_member.id],
+        }
+        for family_member in family_members
+        if family_member.id in conditions_count_by_member
+    ]
 
     return render_template(
         "records/conditions/list.html",
         user_conditions=user_conditions,
         family_conditions=family_conditions,
+        family_status_counts=family_status_counts,
         title="Medical Conditions",
     )
 
 
+@medical_conditions_routes.route("/conditions/family/<int:family_member_id>")
+@login_required
+@monitor_performance
+def list_family_conditions(family_member_id):
+    """List one page of a family member's conditions for the conditions list"""
+    if not _owns_family_member(family_member_id):
+        log_security_event(
+            "unauthorized_family_conditions_access",
+            {"user_id": current_user.id, "family_member_id": family_member_id},
+        )
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    page = request.args.get("page", 1, type=int)
+    conditions = (
+        MedicalCondition.query.options(load_only(*CONDITION_LIST_COLUMNS))
+        .filter_by(family_member_id=family_member_id)
+        .order_by(
+            MedicalCondition.current_status.asc(), MedicalCondition.condition_name.asc()
+        )
+        .paginate(page=page, per_page=FAMILY_CONDITIONS_PER_PAGE, error_out=False)
+    )
+
+    return render_template(
+        "records/conditions/_family_conditions.html",
+        conditions=conditions,
+        family_member_id=family_member_id,
+    )
+
+
 @medical_conditions_routes.route("/conditions/create", methods=["GET", "POST"])
 @login_required
 @limiter.limit("5 per minute")
@@ -80,71 +220,20 @@ def create_condition():
     form = MedicalConditionForm()
 
     # Populate family member choices
-    family_members = [(0, "Myself")] + [
-        (m.id, f"{m.first_name} {m.last_name}") for m in current_user.family_members
-    ]
-    form.family_member.choices = family_members
+    form.family_member.choices = _family_member_choices()
 
     if form.validate_on_submit():
         try:
             # Create new medical condition
-            condition = MedicalCondition(
-                condition_name=sanitize_html(form.condition_name.data),
-                condition_category=form.condition_category.data,
-                icd_code=(
-                    sanitize_html(form.icd_code.data) if form.icd_code.data else None
-                ),
-                diagnosed_date=form.diagnosed_date.data,
-                diagnosing_doctor=(
-                    sanitize_html(form.diagnosing_doctor.data)
-                    if form.diagnosing_doctor.data
-                    else None
-                ),
-                current_status=form.current_status.data,
-                severity=form.severity.data,
-                current_treatments=(
-                    sanitize_html(form.current_treatments.data)
-                    if form.current_treatments.data
-                    else None
-                ),
-                treatment_goals=(
-                    sanitize_html(form.treatment_goals.data)
-                    if form.treatment_goals.data
-                    else None
-                ),
-                treatment_effectiveness=form.treatment_effectiveness.data,
-                prognosis=(
-                    sanitize_html(form.prognosis.data) if form.prognosis.data else None
-                ),
-                monitoring_plan=(
-                    sanitize_html(form.monitoring_plan.data)
-                    if form.monitoring_plan.data
-                    else None
-                ),
-                next_review_date=form.next_review_date.data,
-                quality_of_life_impact=form.quality_of_life_impact.data,
-                functional_limitations=(
-                    sanitize_html(form.functional_limitations.data)
-                    if form.functional_limitations.data
-                    else None
-                ),
-                work_impact=form.work_impact.data,
-                notes=sanitize_html(form.notes.data) if form.notes.data else None,
-                external_resources=(
-                    sanitize_html(form.external_resources.data)
-                    if form.external_resources.data
-                    else None
-                ),
-            )
+            condition = MedicalCondition(**_condition_form_data(form))
 
             # Assign to user or family member
             if form.family_member.data == 0:
                 condition.user_id = current_user.id
             else:
                 # Verify family member belongs to current user
-                family_member = FamilyMember.query.get(form.family_member.data)
-                if family_member and family_member in current_user.family_members:
-                    condition.family_member_id = family_member.id
+                if form.family_member.data in _user_family_member_ids():
+                    condition.family_member_id = form.family_member.data
                 else:
                     log_security_event(
                         "invalid_family_member_assignment",
@@ -197,16 +286,8 @@ def create_condition():
 @monitor_performance
 def view_condition(condition_id):
     """View a specific medical condition with its history"""
-    condition = MedicalCondition.query.get_or_404(condition_id)
-
-    # Check ownership
-    if not _check_condition_access(condition):
-        log_security_event(
-            "unauthorized_condition_access",
-            {"user_id": current_user.id, "condition_id": condition_id},
-        )
-        flash("You don't have permission to view this condition.", "danger")
-        return redirect(url_for("records.medical_conditions_routes.list_conditions"))
+    # Fetch the condition only if the current user owns it
+    condition = _get_owned_condition_or_404(condition_id, "unauthorized_condition_access")
 
     # Get progress notes
     progress_notes = (
@@ -216,15 +297,12 @@ def view_condition(condition_id):
     )
 
     # Get related health records
-    related_records = []
-    if hasattr(condition, "health_records"):
-        related_records = (
-            condition.health_records.order_by(
-                condition.health_records.property.mapper.class_.date.desc()
-            )
-            .limit(10)
-            .all()
-        )
+    related_records = (
+        HealthRecord.query.filter_by(related_condition_id=condition_id)
+        .order_by(HealthRecord.date.desc())
+        .limit(10)
+        .all()
+    )
 
     return render_template(
         "records/conditions/view.html",
@@ -243,24 +321,13 @@ def view_condition(condition_id):
 @monitor_performance
 def edit_condition(condition_id):
     """Edit an existing medical condition"""
-    condition = MedicalCondition.query.get_or_404(condition_id)
-
-    # Check ownership
-    if not _check_condition_access(condition):
-        log_security_event(
-            "unauthorized_condition_edit",
-            {"user_id": current_user.id, "condition_id": condition_id},
-        )
-        flash("You don't have permission to edit this condition.", "danger")
-        return redirect(url_for("records.medical_conditions_routes.list_conditions"))
+    # Fetch the condition only if the current user owns it
+    condition = _get_owned_condition_or_404(condition_id, "unauthorized_condition_edit")
 
     form = MedicalConditionForm(obj=condition)
 
     # Populate family member choices
-    family_members = [(0, "Myself")] + [
-        (m.id, f"{m.first_name} {m.last_name}") for m in current_user.family_members
-    ]
-    form.family_member.choices = family_members
+    form.family_member.choices = _family_member_choices()
 
     # Set current family member selection
     if condition.family_member_id:
@@ -271,54 +338,8 @@ def edit_condition(condition_id):
     if form.validate_on_submit():
         try:
             # Update condition fields
-            condition.condition_name = sanitize_html(form.condition_name.data)
-            condition.condition_category = form.condition_category.data
-            condition.icd_code = (
-                sanitize_html(form.icd_code.data) if form.icd_code.data else None
-            )
-            condition.diagnosed_date = form.diagnosed_date.data
-            condition.diagnosing_doctor = (
-                sanitize_html(form.diagnosing_doctor.data)
-                if form.diagnosing_doctor.data
-                else None
-            )
-            condition.current_status = form.current_status.data
-            condition.severity = form.severity.data
-            condition.current_treatments = (
-                sanitize_html(form.current_treatments.data)
-                if form.current_treatments.data
-                else None
-            )
-            condition.treatment_goals = (
-                sanitize_html(form.treatment_goals.data)
-                if form.treatment_goals.data
-                else None
-            )
-            condition.treatment_effectiveness = form.treatment_effectiveness.data
-            condition.prognosis = (
-                sanitize_html(form.prognosis.data) if form.prognosis.data else None
-            )
-            condition.monitoring_plan = (
-                sanitize_html(form.monitoring_plan.data)
-                if form.monitoring_plan.data
-                else None
-            )
-            condition.next_review_date = form.next_review_date.data
-            condition.quality_of_life_impact = form.quality_of_life_impact.data
-            condition.functional_limitations = (
-                sanitize_html(form.functional_limitations.data)
-                if form.functional_limitations.data
-                else None
-            )
-            condition.work_impact = form.work_impact.data
-            condition.notes = (
-                sanitize_html(form.notes.data) if form.notes.data else None
-            )
-            condition.external_resources = (
-                sanitize_html(form.external_resources.data)
-                if form.external_resources.data
-                else None
-            )
+            for field, value in _condition_form_data(form).items():
+                setattr(condition, field, value)
 
             db.session.commit()
 
@@ -362,19 +383,8 @@ def edit_condition(condition_id):
 @monitor_performance
 def add_progress_note(condition_id):
     """Add a progress note for a medical condition"""
-    condition = MedicalCondition.query.get_or_404(condition_id)
-
-    # Check ownership
-    if not _check_condition_access(condition):
-        log_security_event(
-            "unauthorized_condition_progress",
-            {"user_id": current_user.id, "condition_id": condition_id},
-        )
-        flash(
-            "You don't have permission to add progress notes for this condition.",
-            "danger",
-        )
-        return redirect(url_for("records.medical_conditions_routes.list_conditions"))
+    # Fetch the condition only if the current user owns it
+    condition = _get_owned_condition_or_404(condition_id, "unauthorized_condition_progress")
 
     form = ConditionProgressForm()
     form.condition_id.choices = [(condition.id, condition.condition_name)]
@@ -384,41 +394,8 @@ def add_progress_note(condition_id):
         try:
             progress_note = ConditionProgressNote(
                 condition_id=condition.id,
-                note_date=form.note_date.data,
-                progress_status=form.progress_status.data,
-                symptoms_changes=(
-                    sanitize_html(form.symptoms_changes.data)
-                    if form.symptoms_changes.data
-                    else None
-                ),
-                treatment_changes=(
-                    sanitize_html(form.treatment_changes.data)
-                    if form.treatment_changes.data
-                    else None
-                ),
-                pain_level=form.pain_level.data,
-                functional_score=form.functional_score.data,
-                vital_measurements=(
-                    sanitize_html(form.vital_measurements.data)
-                    if form.vital_measurements.data
-                    else None
-                ),
-                clinical_observations=(
-                    sanitize_html(form.clinical_observations.data)
-                    if form.clinical_observations.data
-                    else None
-                ),
-                doctor_notes=(
-                    sanitize_html(form.doctor_notes.data)
-                    if form.doctor_notes.data
-                    else None
-                ),
-                patient_reported_outcomes=(
-                    sanitize_html(form.patient_reported_outcomes.data)
-                    if form.patient_reported_outcomes.data
-                    else None
-                ),
-                recorded_by=form.recorded_by.data,
+                **_sanitize_form_fields(form, PROGRESS_NOTE_TEXT_FIELDS),
+                **{field: getattr(form, field).data for field in PROGRESS_NOTE_FIELDS},
             )
 
             db.session.add(progress_note)
@@ -458,22 +435,18 @@ def add_progress_note(condition_id):
 @monitor_performance
 def analyze_condition(condition_id):
     """Get AI analysis of condition progression"""
-    condition = MedicalCondition.query.get_or_404(condition_id)
-
-    # Check ownership
-    if not _check_condition_access(condition):
-        log_security_event(
-            "unauthorized_condition_analysis",
-            {"user_id": current_user.id, "condition_id": condition_id},
-        )
-        return jsonify({"error": "Unauthorized access"}), 403
-
-    try:
-        analysis = analyze_condition_progression(condition_id)
-        return jsonify(analysis)
-    except Exception as e:
-        current_app.logger.error(f"Error in condition analysis: {e}")
-        return jsonify({"error": "Analysis failed"}), 500
+    # Fetch the condition only if the current user owns it
+    condition = _get_owned_condition_or_404(condition_id, "unauthorized_condition_analysis")
+
+    # AI calls can take many seconds, so run them off the request thread
+    # and let the client poll for the result
+    return _start_ai_job(
+        _analysis_result_key(condition),
+        AI_ANALYSIS_CACHE_TIMEOUT,
+        "Analysis failed",
+        analyze_condition_progression,
+        condition_id,
+    )
 
 
 @medical_conditions_routes.route("/conditions/insights")
@@ -484,21 +457,279 @@ def get_insights():
     """Get comprehensive condition insights for user or family member"""
     family_member_id = request.args.get("family_member_id", type=int)
 
-    try:
-        insights = get_condition_insights(current_user.id, family_member_id)
-        return jsonify(insights)
-    except Exception as e:
-        current_app.logger.error(f"Error getting condition insights: {e}")
-        return jsonify({"error": "Insights generation failed"}), 500
+    return _start_ai_job(
+        _insights_result_key(current_user.id, family_member_id),
+        AI_INSIGHTS_CACHE_TIMEOUT,
+        "Insights generation failed",
+        get_condition_insights,
+        current_user.id,
+        family_member_id,
+    )
 
 
-def _check_condition_access(condition: MedicalCondition) -> bool:
-    """Check if current user has access to the medical condition"""
-    if condition.user_id == current_user.id:
-        return True
+@medical_conditions_routes.route("/conditions/ai-jobs/<job_id>")
+@login_required
+@monitor_performance
+def ai_job_status(job_id):
+    """Get the status of a background condition analysis or insights job"""
+    job = cache_manager.get(_ai_job_key(current_user.id, job_id))
+    if job is None:
+        return jsonify({"error": "Analysis job not found"}), 404
+
+    return jsonify(job)
+
+
+def _get_owned_condition_or_404(condition_id: int, event_type: str) -> MedicalCondition:
+    """Fetch a medical condition the current user has access to, or abort with 404
+
+    Ownership is part of the query: the condition must belong to the user or
+    to one of their family members. Missing and unauthorized conditions both
+    return 404, so the response does not reveal which condition IDs exist.
+
+    Args:
+        condition_id: ID of the medical condition
+        event_type: Security event logged when no accessible condition matches
+
+    Returns:
+        The medical condition
+    """
+    owns_family_member = db.exists().where(
+        user_family.c.user_id == current_user.id,
+        user_family.c.family_member_id == MedicalCondition.family_member_id,
+    )
+    condition = MedicalCondition.query.filter(
+        MedicalCondition.id == condition_id,
+        or_(MedicalCondition.user_id == current_user.id, owns_family_member),
+    ).first()
+
+    if condition is None:
+        log_security_event(
+            event_type, {"user_id": current_user.id, "condition_id": condition_id}
+        )
+        abort(404)
+    return condition
+
+
+def _owns_family_member(family_member_id: int) -> bool:
+    """Check if the family member belongs to the current user
+
+    Indexed lookup on the user_family primary key, without loading the
+    current user's family members.
+    """
+    return db.session.query(
+        db.exists().where(
+            user_family.c.user_id == current_user.id,
+            user_family.c.family_member_id == family_member_id,
+        )
+    ).scalar()
+
+
+def _family_member_choices() -> list[tuple[int, str]]:
+    """Build the condition form's owner choices: the user, then each family member"""
+    return [(0, "Myself")] + [
+        (m.id, f"{m.first_name} {m.last_name}") for m in current_user.family_members
+    ]
+
+
+def _user_family_member_ids() -> set[int]:
+    """Get the IDs of the current user's family members
+
+    Used where the family_members collection is already loaded for form
+    choices, so ownership checks are a set lookup instead of another query.
+    """
+    return {member.id for member in current_user.family_members}
+
+
+def _condition_form_data(form: MedicalConditionForm) -> dict[str, Any]:
+    """Map a medical condition form to model column values
+
+    Args:
+        form: Validated medical condition form
+
+    Returns:
+        Column values for creating or updating a MedicalCondition
+    """
+    data = {"condition_name": sanitize_html(form.condition_name.data)}
+    data.update(_sanitize_form_fields(form, CONDITION_TEXT_FIELDS))
+    data.update({field: getattr(form, field).data for field in CONDITION_FIELDS})
+    return data
+
+
+def _sanitize_form_fields(form, fields: tuple[str, ...]) -> dict[str, Optional[str]]:
+    """Sanitize optional free-text form fields
+
+    Args:
+        form: Validated form holding the fields
+        fields: Names of the fields to sanitize
+
+    Returns:
+        Sanitized value per field, None for fields left empty
+    """
+    data = {}
+    for field in fields:
+        value = getattr(form, field).data
+        data[field] = sanitize_html(value) if value else None
+    return data
+
+
+def _start_ai_job(
+    result_key: str, result_timeout: int, error_message: str, ai_function, *args
+) -> tuple[Any, int]:
+    """Run an AI analysis function on the background AI job pool
+
+    A result cached under result_key is reused, so the job completes without
+    calling the AI provider again. While an analysis for result_key is still
+    running, the user is pointed at that job instead of starting another.
+
+    Args:
+        result_key: Cache key for the analysis result
+        result_timeout: Seconds to cache a successful result
+        error_message: Error reported to the client if the analysis fails
+        ai_function: Analysis function from medical_condition_ai
+        *args: Arguments for the analysis function
+
+    Returns:
+        202 response with the URL to poll for the job's result
+    """
+    user_id = current_user.id
+    pending_key = _pending_ai_job_key(result_key)
+
+    running_job = cache_manager.get(pending_key)
+    if running_job is not None and running_job["user_id"] == user_id:
+        job_id = running_job["job_id"]
+    else:
+        job_id = uuid.uuid4().hex
+        key = _ai_job_key(user_id, job_id)
+
+        cached_result = cache_manager.get(result_key)
+        if cached_result is not None:
+            cache_manager.set(
+                key,
+                {"status": "complete", "data": cached_result},
+                timeout=AI_JOB_TIMEOUT,
+            )
+        else:
+            cache_manager.set(key, {"status": "pending"}, timeout=AI_JOB_TIMEOUT)
+            cache_manager.set(
+                pending_key,
+                {"user_id": user_id, "job_id": job_id},
+                timeout=AI_JOB_TIMEOUT,
+            )
+            _ai_job_pool.submit(
+                _run_ai_job,
+                current_app._get_current_object(),
+                key,
+                result_key,
+                result_timeout,
+                error_message,
+                ai_function,
+                args,
+            )
+
+    return (
+        jsonify(
+            {
+                "status": "pending",
+                "status_url": url_for(
+                    "records.medical_conditions_routes.ai_job_status", job_id=job_id
+                ),
+            }
+        ),
+        202,
+    )
+
+
+def _run_ai_job(app, key, result_key, result_timeout, error_message, ai_function, args):
+    """Run an AI analysis outside the request cycle and record the outcome"""
+    with app.app_context():
+        try:
+            try:
+                result = ai_function(*args)
+            except Exception as e:
+                app.logger.error(f"Error in background condition analysis: {e}")
+                result = {"error": error_message}
+
+            # The analysis functions report their own failures as an "error" key
+            if "error" in result:
+                job = {"status": "failed", "error": error_message}
+            else:
+                job = {"status": "complete", "data": result}
+                # Only cache real AI output; the demo text returned when every
+                # provider is down must not outlive the outage
+                if result.get("model_used") not in (None, DEMO_MODEL_NAME):
+                    cache_manager.set(result_key, result, timeout=result_timeout)
+            cache_manager.set(key, job, timeout=AI_JOB_TIMEOUT)
+        finally:
+            cache_manager.delete(_pending_ai_job_key(result_key))
+
+
+def _analysis_result_key(condition: MedicalCondition) -> str:
+    """Cache key for a condition's AI analysis, covering the data it reads
+
+    The key includes the condition's last update and the count and latest
+    ID of its progress notes and related health records, so any change to
+    the analyzed data produces a new key.
+    """
+    notes_count, latest_note_id = (
+        db.session.query(
+            db.func.count(ConditionProgressNote.id), db.func.max(ConditionProgressNote.id)
+        )
+        .filter(ConditionProgressNote.condition_id == condition.id)
+        .one()
+    )
+    records_count, latest_record_update = (
+        db.session.query(db.func.count(HealthRecord.id), db.func.max(HealthRecord.updated_at))
+        .filter(HealthRecord.related_condition_id == condition.id)
+        .one()
+    )
+    return (
+        f"condition_ai:analysis:{condition.id}:{condition.updated_at}:"
+        f"{notes_count}:{latest_note_id}:{records_count}:{latest_record_update}"
+    )
+
+
+def _insights_result_key(user_id: int, family_member_id: Optional[int]) -> str:
+    """Cache key for a person's condition insights, covering their conditions
+
+    Args:
+        user_id: ID of the requesting user
+        family_member_id: Family member the insights are for, or None for
+            the user themselves
+
+    Returns:
+        Key that changes whenever the person's conditions or progress notes do
+    """
+    if family_member_id:
+        owner_filter = MedicalCondition.family_member_id == family_member_id
+    else:
+        owner_filter = MedicalCondition.user_id == user_id
+
+    conditions_count, latest_condition_update = (
+        db.session.query(
+            db.func.count(MedicalCondition.id), db.func.max(MedicalCondition.updated_at)
+        )
+        .filter(owner_filter)
+        .one()
+    )
+    notes_count, latest_note_id = (
+        db.session.query(
+            db.func.count(ConditionProgressNote.id), db.func.max(ConditionProgressNote.id)
+        )
+        .join(MedicalCondition, ConditionProgressNote.condition_id == MedicalCondition.id)
+        .filter(owner_filter)
+        .one()
+    )
+    return (
+        f"user:{user_id}:condition_ai:insights:{family_member_id}:"
+        f"{conditions_count}:{latest_condition_update}:{notes_count}:{latest_note_id}"
+    )
+
+
+def _ai_job_key(user_id: int, job_id: str) -> str:
+    """Cache key holding a background AI job's status"""
+    return f"user:{user_id}:condition_ai_job:{job_id}"
 
-    if condition.family_member_id:
-        family_member = FamilyMember.query.get(condition.family_member_id)
-        return family_member and family_member in current_user.family_members
 
-    return False
+def _pending_ai_job_key(result_key: str) -> str:
+    """Cache key marking an analysis for result_key as still running"""
+    return f"{result_key}:pending"
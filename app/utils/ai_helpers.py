@@ -20,6 +20,10 @@ HTTP_OK = 200
 HTTP_UNAUTHORIZED = 401
 HTTP_PAYMENT_REQUIRED = 402
 
+# Model name reported when every AI provider failed and a canned demo
+# response was returned instead
+DEMO_MODEL_NAME = "Demo Mode"
+
 # Global flags to avoid repeated failed attempts
 _huggingface_credits_exhausted = False
 _groq_unavailable = False
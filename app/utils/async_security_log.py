@@ -0,0 +1,145 @@
+"""
+Background security event logging for the Personal Health Record Manager.
+Queues security events on the request path and writes them from a daemon
+worker thread, so log handler I/O does not add to response latency.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from typing import Any
+
+from flask import current_app
+
+# Maximum number of events waiting to be written before logging falls back
+# to the request thread
+MAX_QUEUED_SECURITY_EVENTS = 10000
+
+# Maximum number of queued events the writer handles per wake-up
+SECURITY_EVENT_BATCH_SIZE = 100
+
+# Seconds to wait for queued events to be written when the process exits
+SECURITY_LOG_SHUTDOWN_TIMEOUT = 5
+
+# Queued after the last event at exit to tell the writer thread to stop
+_STOP_WRITER = object()
+
+logger = logging.getLogger(__name__)
+
+_event_queue = queue.Queue(maxsize=MAX_QUEUED_SECURITY_EVENTS)
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def enqueue_security_event(event_type: str, data: dict[str, Any]) -> None:
+    """Queue a security event to be logged in the background
+
+    log_security_event delegates here. The application logger is captured
+    here, while the app context is still available. Outside an app context
+    the event is written synchronously to this module's logger.
+
+    Args:
+        event_type: Name of the security event
+        data: Event details to include in the log entry
+    """
+    if not current_app:
+        # No application logger to hand to the worker; never drop the event
+        _write_event(logger, event_type, data)
+        return
+
+    app_logger = current_app.logger
+    _ensure_worker()
+    try:
+        _event_queue.put_nowait((app_logger, event_type, data))
+    except queue.Full:
+        # Never drop security events; write it synchronously instead
+        _write_event(app_logger, event_type, data)
+
+
+# Helper functions
+
+
+def _ensure_worker():
+    """Start the background writer thread if it is not running"""
+    global _worker
+
+    if _worker is not None and _worker.is_alive():
+        return
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_drain_events, name="security-event-logger", daemon=True
+            )
+            _worker.start()
+
+
+def _drain_events():
+    """Write queued security events in batches until told to stop"""
+    while True:
+        # Block for the next event, then take whatever else is already queued
+        batch = [_event_queue.get()]
+        while len(batch) < SECURITY_EVENT_BATCH_SIZE:
+            try:
+                batch.append(_event_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        stop = False
+        for item in batch:
+            try:
+                if item is _STOP_WRITER:
+                    stop = True
+                else:
+                    _write_event(*item)
+            except Exception:
+                # Keep the writer alive; a failing handler must not stop logging
+                pass
+            finally:
+                _event_queue.task_done()
+
+        if stop:
+            return
+
+
+def _flush_at_exit():
+    """Write every queued security event before the process exits
+
+    The writer is a daemon thread, so without this, events still queued when
+    a worker restarts or shuts down would be lost. The writer gets a bounded
+    time to finish; anything left after that is written here.
+    """
+    worker = _worker
+    if worker is not None and worker.is_alive():
+        try:
+            _event_queue.put(_STOP_WRITER, timeout=SECURITY_LOG_SHUTDOWN_TIMEOUT)
+            worker.join(timeout=SECURITY_LOG_SHUTDOWN_TIMEOUT)
+        except queue.Full:
+            pass
+
+    while True:
+        try:
+            item = _event_queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is not _STOP_WRITER:
+            try:
+                _write_event(*item)
+            except Exception:
+                pass
+        _event_queue.task_done()
+
+
+atexit.register(_flush_at_exit)
+
+
+def _write_event(logger, event_type, data):
+    """Write a security event to the application log
+
+    Args:
+        logger: Application logger to write to
+        event_type: Name of the security event
+        data: Event details to include in the log entry
+    """
+    logger.info(f"Security Event: {event_type} - {data}")
@@ -2,6 +2,7 @@
 BackupManager utility for creating local backups of user data.
 """
 
+import itertools
 import json
 import os
 import shutil
@@ -12,6 +13,17 @@ from typing import Dict, List, Optional
 
 from flask import current_app
 
+# Backup files are read by the restore code, not people, so skip the
+# whitespace json emits by default
+COMPACT_JSON_SEPARATORS = (",", ":")
+
+# Recompute every family member's denormalized health record count
+RECOUNT_FAMILY_RECORDS_SQL = (
+    "UPDATE family_members SET record_count = ("
+    "SELECT COUNT(*) FROM health_records "
+    "WHERE health_records.family_member_id = family_members.id)"
+)
+
 
 class BackupManager:
     """Utility for managing backups of user data"""
@@ -34,7 +46,8 @@ class BackupManager:
         Returns:
             The path to the backup directory
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         backup_id = str(uuid.uuid4())[:8]
         backup_name = f"backup_{user_id}_{timestamp}_{backup_id}"
 
@@ -56,14 +69,14 @@ class BackupManager:
             "backup_id": backup_id,
             "user_id": user_id,
             "timestamp": timestamp,
-            "datetime": datetime.now().isoformat(),
+            "datetime": now.isoformat(),
             "include_files": include_files,
             "database_records": db_backup,
             "file_backup": file_backup,
         }
 
         with open(os.path.join(backup_path, "metadata.json"), "w") as f:
-            json.dump(metadata, f, indent=2)
+            json.dump(metadata, f, separators=COMPACT_JSON_SEPARATORS)
 
         return backup_path
 
@@ -208,18 +221,19 @@ class BackupManager:
         # Track counts of backed up records
         record_counts = {}
 
+        # Family members are linked through user_family, so look them up once
+        # and reuse them for every table keyed by family_member_id
+        family_members = self._get_user_family_members(cursor, user_id)
+
         # Tables and their user ID columns for different relationships
         tables = {
             "users": {"id_column": "id", "filter_value": user_id},
-            "family_members": {
-                "id_column": "id",
-                "records": self._get_user_family_members(cursor, user_id),
-            },
+            "family_members": {"id_column": "id", "records": family_members},
             "health_records": {"id_column": "user_id", "filter_value": user_id},
             "medical_conditions": {"id_column": "user_id", "filter_value": user_id},
             "current_medications": {
                 "id_column": "family_member_id",
-                "parent_table": "family_members",
+                "records": family_members,
             },
             "documents": {
                 "id_column": "health_record_id",
@@ -245,63 +259,70 @@ class BackupManager:
     def _backup_table(
         self, cursor, table_name: str, config: Dict, data_path: str, user_id: int
     ) -> Dict:
-        """Backup a single table's data to a JSON file"""
-        records = []
+        """Backup a single table's data to a JSON Lines file"""
+        values = []
 
         try:
             # Direct filtering by user ID
             if "filter_value" in config:
-                cursor.execute(
-                    f"SELECT * FROM {table_name} WHERE {config['id_column']} = ?",
-                    (config["filter_value"],),
-                )
-                records = [dict(row) for row in cursor.fetchall()]
+                values = [config["filter_value"]]
 
             # Filtering by list of IDs from parent table
             elif "records" in config:
-                ids = [record["id"] for record in config["records"]]
-                if ids:
-                    placeholders = ", ".join(["?"] * len(ids))
-                    cursor.execute(
-                        f"SELECT * FROM {table_name} WHERE {config['id_column']} IN ({placeholders})",
-                        ids,
-                    )
-                    records = [dict(row) for row in cursor.fetchall()]
+                values = [record["id"] for record in config["records"]]
 
             # Filtering by foreign key in parent table
             elif "parent_table" in config:
-                parent_ids = []
-
-                # Get parent table records first
-                if config["parent_table"] == "family_members":
-                    parent_records = self._get_user_family_members(cursor, user_id)
-                    parent_ids = [record["id"] for record in parent_records]
-                elif config["parent_table"] == "health_records":
-                    cursor.execute(
-                        "SELECT id FROM health_records WHERE user_id = ?", (user_id,)
-                    )
-                    parent_ids = [row[0] for row in cursor.fetchall()]
-
-                # Then get records from the target table
-                if parent_ids:
-                    placeholders = ", ".join(["?"] * len(parent_ids))
-                    cursor.execute(
-                        f"SELECT * FROM {table_name} WHERE {config['id_column']} IN ({placeholders})",
-                        parent_ids,
-                    )
-                    records = [dict(row) for row in cursor.fetchall()]
+                cursor.execute(
+                    f"SELECT id FROM {config['parent_table']} WHERE user_id = ?",
+                    (user_id,),
+                )
+                values = [row[0] for row in cursor.fetchall()]
+
+            count = self._write_rows(
+                cursor, table_name, config["id_column"], values, data_path
+            )
 
         except sqlite3.Error as e:
             # Table might not exist or other database error
             return {"status": "error", "count": 0, "message": str(e)}
 
-        # Save records to file
-        if records:
-            output_path = os.path.join(data_path, f"{table_name}.json")
-            with open(output_path, "w") as f:
-                json.dump(records, f, indent=2)
+        return {"status": "success", "count": count}
+
+    def _write_rows(
+        self, cursor, table_name: str, column: str, values: List, data_path: str
+    ) -> int:
+        """Write all rows of a table whose column matches any of the given values
+
+        Rows are streamed from the cursor to disk, one JSON document per line,
+        so memory use stays flat regardless of table size.
+
+        Returns:
+            The number of rows written
+        """
+        if not values:
+            return 0
+
+        placeholders = ", ".join(["?"] * len(values))
+        cursor.execute(
+            f"SELECT * FROM {table_name} WHERE {column} IN ({placeholders})",
+            values,
+        )
 
-        return {"status": "success", "count": len(records)}
+        # Only create the file when there is something to write
+        first_row = cursor.fetchone()
+        if first_row is None:
+            return 0
+
+        count = 0
+        output_path = os.path.join(data_path, f"{table_name}.jsonl")
+        with open(output_path, "w") as f:
+            for row in itertools.chain((first_row,), cursor):
+                f.write(json.dumps(dict(row), separators=COMPACT_JSON_SEPARATORS))
+                f.write("\n")
+                count += 1
+
+        return count
 
     def _get_user_family_members(self, cursor, user_id: int) -> List[Dict]:
         """Get all family members associated with a user through the user_family association table"""
@@ -375,13 +396,7 @@ class BackupManager:
 
         # Restore each table in order
         for table_name in restore_order:
-            table_path = os.path.join(data_path, f"{table_name}.json")
-            if not os.path.exists(table_path):
-                restored_counts[table_name] = 0
-                continue
-
-            with open(table_path) as f:
-                records = json.load(f)
+            records = self._load_table_records(data_path, table_name)
 
             if records:
                 count = self._restore_table(cursor, table_name, records)
@@ -389,6 +404,10 @@ class BackupManager:
             else:
                 restored_counts[table_name] = 0
 
+        # Restored health records bypass the ORM events that maintain the
+        # denormalized family member record counts, so recompute them
+        cursor.execute(RECOUNT_FAMILY_RECORDS_SQL)
+
         conn.commit()
         conn.close()
 
@@ -398,6 +417,21 @@ class BackupManager:
             "total_restored": sum(restored_counts.values()),
         }
 
+    def _load_table_records(self, data_path: str, table_name: str) -> List[Dict]:
+        """Load a table's records from a backup, accepting JSON Lines or legacy JSON"""
+        jsonl_path = os.path.join(data_path, f"{table_name}.jsonl")
+        if os.path.exists(jsonl_path):
+            with open(jsonl_path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+
+        # Backups created before the JSON Lines format store a single array
+        json_path = os.path.join(data_path, f"{table_name}.json")
+        if os.path.exists(json_path):
+            with open(json_path) as f:
+                return json.load(f)
+
+        return []
+
     def _restore_table(self, cursor, table_name: str, records: List[Dict]) -> int:
         """Restore records to a table, handling duplicates appropriately"""
         restored_count = 0
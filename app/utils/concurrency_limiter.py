@@ -0,0 +1,122 @@
+"""
+Concurrent request limiting for expensive endpoints.
+Caps how many requests a user may have in flight at once, complementing the
+per-minute rate limits applied with Flask-Limiter.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Callable
+
+from flask import current_app, jsonify
+from flask_login import current_user
+
+from .security_utils import log_security_event
+from .unified_cache import cache_manager
+
+# Drop slots older than the timeout, then claim one if the user is under the limit.
+# Runs atomically on the Redis server so concurrent workers cannot both claim
+# the last free slot.
+_ACQUIRE_SLOT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local timeout = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - timeout)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], timeout)
+return 1
+"""
+
+# In-memory fallback used when Redis is unavailable (per process only)
+_local_slots = defaultdict(dict)
+_local_slots_lock = threading.Lock()
+_acquire_script = None
+
+
+def _acquire_slot(key: str, request_id: str, max_concurrent: int, timeout: int) -> bool:
+    """Claim an in-flight slot for a request, returning False if none are free"""
+    global _acquire_script
+
+    now = time.time()
+    if cache_manager.redis_available and cache_manager.redis_client:
+        try:
+            if _acquire_script is None:
+                _acquire_script = cache_manager.redis_client.register_script(
+                    _ACQUIRE_SLOT_SCRIPT
+                )
+            return bool(
+                _acquire_script(
+                    keys=[key], args=[now, timeout, max_concurrent, request_id]
+                )
+            )
+        except Exception as e:
+            current_app.logger.warning(f"Concurrency limiter Redis error: {e}")
+
+    with _local_slots_lock:
+        slots = _local_slots[key]
+        for stale_id in [rid for rid, started in slots.items() if started <= now - timeout]:
+            del slots[stale_id]
+        if len(slots) >= max_concurrent:
+            return False
+        slots[request_id] = now
+        return True
+
+
+def _release_slot(key: str, request_id: str) -> None:
+    """Release a previously claimed in-flight slot"""
+    if cache_manager.redis_available and cache_manager.redis_client:
+        try:
+            cache_manager.redis_client.zrem(key, request_id)
+            return
+        except Exception as e:
+            current_app.logger.warning(f"Concurrency limiter Redis error: {e}")
+
+    with _local_slots_lock:
+        _local_slots[key].pop(request_id, None)
+
+
+def concurrent_limit(
+    max_concurrent: int = 1, resource: str = "default", timeout: int = 600
+) -> Callable:
+    """Limit how many requests for a resource a user may run at the same time
+
+    Args:
+        max_concurrent: Maximum simultaneous in-flight requests per user
+        resource: Name grouping the endpoints that share the limit
+        timeout: Seconds after which an unreleased slot is considered stale
+    """
+
+    def decorator(view_function: Callable) -> Callable:
+        @wraps(view_function)
+        def decorated_function(*args: Any, **kwargs: Any) -> Any:
+            key = f"concurrency:{resource}:{current_user.id}"
+            request_id = os.urandom(16).hex()
+
+            if not _acquire_slot(key, request_id, max_concurrent, timeout):
+                log_security_event(
+                    "concurrent_limit_exceeded",
+                    {"user_id": current_user.id, "resource": resource},
+                )
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "error": "A similar request is already in progress. Please wait for it to finish.",
+                        }
+                    ),
+                    429,
+                )
+
+            try:
+                return view_function(*args, **kwargs)
+            finally:
+                _release_slot(key, request_id)
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,57 @@
+"""
+JSON serialization for the Personal Health Record Manager.
+Uses orjson for API responses when it is installed, falling back to Flask's
+standard library based provider otherwise.
+"""
+
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson not installed, keep Flask's default provider
+
+# Match Flask's default output: sorted keys, int dict keys allowed, and dates
+# passed through to the provider's default() so they keep Flask's format
+_ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson
+    else 0
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson's C serializer"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Keyword arguments are json.dumps specific, so defer to the stdlib
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Any:
+        # Debug responses are pretty-printed by the default provider
+        if self._app.debug:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS),
+            mimetype=self.mimetype,
+        )
+
+
+def configure_json_provider(app) -> None:
+    """Install the orjson provider on the app if orjson is available"""
+    if orjson is None:
+        return
+
+    app.json = OrjsonProvider(app)
+    app.logger.info("Using orjson for JSON responses")
@@ -113,6 +113,7 @@ def analyze_condition_progression(condition_id: int) -> dict[str, Any]:
             "condition_name": condition.condition_name,
             "analysis_date": datetime.now(timezone.utc).isoformat(),
             "data_points_analyzed": len(recent_notes) + len(related_records),
+            "model_used": model_used,
         }
 
     except Exception as e:
@@ -242,6 +243,7 @@ def get_condition_insights(
             "conditions_count": len(conditions),
             "analysis_date": datetime.now(timezone.utc).isoformat(),
             "conditions_summary": conditions_summary,
+            "model_used": model_used,
         }
 
     except Exception as e:
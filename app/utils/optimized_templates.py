@@ -351,6 +351,13 @@ def optimize_jinja_environment(app):
     # Cache compiled templates
     app.jinja_env.cache_size = 400 if not app.debug else 0
     
+    # Share compiled template bytecode across worker processes and restarts
+    if not app.debug:
+        from jinja2 import FileSystemBytecodeCache
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+            app.config.get('JINJA_BYTECODE_CACHE_DIR')
+        )
+    
     # Enable optimizations
     app.jinja_env.optimized = not app.debug
     
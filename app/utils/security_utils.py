@@ -7,13 +7,21 @@ import os
 import re
 from typing import Any, Optional
 
-from flask import current_app
+from .async_security_log import enqueue_security_event
+
+# HTML sanitization patterns, compiled once at import
+_SCRIPT_TAG_PATTERN = re.compile(r"<script[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+_EVENT_HANDLER_PATTERN = re.compile(r'\bon\w+\s*=\s*["\'][^"\']*["\']', re.IGNORECASE)
+_JAVASCRIPT_URL_PATTERN = re.compile(r"javascript:", re.IGNORECASE)
 
 
 def log_security_event(event_type: str, data: dict[str, Any]) -> None:
-    """Centralized security event logging"""
-    if current_app:
-        current_app.logger.info(f"Security Event: {event_type} - {data}")
+    """Centralized security event logging
+
+    Events are queued and written by a background thread, so callers never
+    wait on log handler I/O.
+    """
+    enqueue_security_event(event_type, data)
 
 
 def detect_suspicious_patterns(text: str) -> bool:
@@ -45,11 +53,13 @@ def sanitize_html(text: Optional[str]) -> str:
     """Basic HTML sanitization"""
     if not text:
         return ""
-    text = re.sub(
-        r"<script[^>]*>.*?</script>", "", text, flags=re.IGNORECASE | re.DOTALL
-    )
-    text = re.sub(r'\bon\w+\s*=\s*["\'][^"\']*["\']', "", text, flags=re.IGNORECASE)
-    text = re.sub(r"javascript:", "", text, flags=re.IGNORECASE)
+    # Every pattern needs a "<", "=" or ":" to match, so plain text (most
+    # form fields) is returned without running the regexes
+    if "<" not in text and "=" not in text and ":" not in text:
+        return text
+    text = _SCRIPT_TAG_PATTERN.sub("", text)
+    text = _EVENT_HANDLER_PATTERN.sub("", text)
+    text = _JAVASCRIPT_URL_PATTERN.sub("", text)
     return text
 
 
@@ -0,0 +1,43 @@
+"""Add owner, status and name indexes to medical conditions
+
+Revision ID: condition_list_index_001
+Revises: document_filename_index_001
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "condition_list_index_001"
+down_revision = "document_filename_index_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("medical_conditions", schema=None) as batch_op:
+        # The composite indexes lead with the same owner columns, so they
+        # replace the single-column owner indexes
+        batch_op.drop_index("idx_medical_conditions_user")
+        batch_op.drop_index("idx_medical_conditions_family_member")
+        batch_op.create_index(
+            "idx_medical_conditions_user_status_name",
+            ["user_id", "current_status", "condition_name"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "idx_medical_conditions_family_member_status_name",
+            ["family_member_id", "current_status", "condition_name"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("medical_conditions", schema=None) as batch_op:
+        batch_op.drop_index("idx_medical_conditions_family_member_status_name")
+        batch_op.drop_index("idx_medical_conditions_user_status_name")
+        batch_op.create_index(
+            "idx_medical_conditions_family_member", ["family_member_id"], unique=False
+        )
+        batch_op.create_index("idx_medical_conditions_user", ["user_id"], unique=False)
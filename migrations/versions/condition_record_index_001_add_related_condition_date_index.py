@@ -0,0 +1,30 @@
+"""Add related condition and date index to health records
+
+Revision ID: condition_record_index_001
+Revises: condition_list_index_001
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "condition_record_index_001"
+down_revision = "condition_list_index_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("health_records", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_health_records_related_condition_date",
+            ["related_condition_id", sa.text("date DESC")],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("health_records", schema=None) as batch_op:
+        batch_op.drop_index("idx_health_records_related_condition_date")
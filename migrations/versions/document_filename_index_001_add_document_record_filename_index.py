@@ -0,0 +1,53 @@
+"""Add health record and filename index to documents
+
+Revision ID: document_filename_index_001
+Revises: family_ai_context_001
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+import os
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "document_filename_index_001"
+down_revision = "family_ai_context_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # File downloads now match on filename, so make sure it holds the stored
+    # file's basename for any rows whose file_path was saved as a full path
+    connection = op.get_bind()
+    documents = sa.table(
+        "documents",
+        sa.column("id", sa.Integer),
+        sa.column("filename", sa.String),
+        sa.column("file_path", sa.String),
+    )
+    rows = connection.execute(
+        sa.select(documents.c.id, documents.c.filename, documents.c.file_path)
+    ).fetchall()
+    for row in rows:
+        basename = os.path.basename(row.file_path.replace("\\", "/"))
+        if basename and basename != row.filename:
+            connection.execute(
+                documents.update()
+                .where(documents.c.id == row.id)
+                .values(filename=basename)
+            )
+
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_documents_record_filename",
+            ["health_record_id", "filename"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.drop_index("idx_documents_record_filename")
@@ -0,0 +1,28 @@
+"""Add AI context hash to family members
+
+Revision ID: family_ai_context_001
+Revises: health_record_index_001
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "family_ai_context_001"
+down_revision = "health_record_index_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("family_members", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("ai_context_hash", sa.String(length=32), nullable=True)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("family_members", schema=None) as batch_op:
+        batch_op.drop_column("ai_context_hash")
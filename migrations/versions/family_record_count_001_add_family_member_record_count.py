@@ -0,0 +1,35 @@
+"""Add denormalized record count to family members
+
+Revision ID: family_record_count_001
+Revises: family_search_trgm_001
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "family_record_count_001"
+down_revision = "family_search_trgm_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("family_members", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("record_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    # Backfill the counts for existing health records
+    op.execute(
+        "UPDATE family_members SET record_count = ("
+        "SELECT COUNT(*) FROM health_records "
+        "WHERE health_records.family_member_id = family_members.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("family_members", schema=None) as batch_op:
+        batch_op.drop_column("record_count")
@@ -0,0 +1,42 @@
+"""Add trigram indexes for family member search
+
+Revision ID: family_search_trgm_001
+Revises: 60b773dd37d4
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "family_search_trgm_001"
+down_revision = "60b773dd37d4"
+branch_labels = None
+depends_on = None
+
+# Columns matched by the family list search (ILIKE '%term%')
+SEARCH_COLUMNS = ("first_name", "last_name", "relationship")
+
+
+def upgrade():
+    # Trigram indexes are PostgreSQL only; other databases keep scanning
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_family_members_{column}_trgm",
+            "family_members",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f"ix_family_members_{column}_trgm", table_name="family_members")
@@ -0,0 +1,30 @@
+"""Add family member and date index to health records
+
+Revision ID: health_record_index_001
+Revises: family_record_count_001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "health_record_index_001"
+down_revision = "family_record_count_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("health_records", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_health_records_family_member_date",
+            ["family_member_id", sa.text("date DESC")],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("health_records", schema=None) as batch_op:
+        batch_op.drop_index("idx_health_records_family_member_date")